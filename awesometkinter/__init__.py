@@ -10,11 +10,15 @@ import tkinter as tk
 from tkinter import ttk
 
 from .button import Button3d, Radiobutton, Checkbutton
-from .frame import Frame3d, ScrollableFrame
+from .frame import Frame3d, ScrollableFrame, VirtualList
 from .menu import RightClickMenu
-from .progressbar import RadialProgressbar, RadialProgressbar3d, Segmentbar
+from .progressbar import (RadialProgressbar, RadialProgressbar3d, ProgressGrid, Segmentbar, BitmapSegmentbar,
+                          MultiSegmentbar, ZoomableSegmentbar)
 from .scrollbar import SimpleScrollbar
-from .text import ScrolledText
+from .telemetry import TransferTelemetry
+from .progresschannel import ProgressChannel
+from .animation import AnimationClock, FlushQueue, get_clock
+from .text import ScrolledText, ScrolledTextHandler
 from .utils import *
 from .config import *
 from .version import __version__
@@ -22,6 +26,8 @@ from .tooltip import tooltip
 from .label import AutofitLabel, AutoWrappingLabel
 from .dialog import filechooser, folderchooser
 from .datepicker import DatePicker
+from .asynctk import AsyncTk, ask_date, ask_path
+from .browser import DirectoryBrowser
 
 
 def main():
@@ -0,0 +1,280 @@
+"""
+    AwesomeTkinter, a new tkinter widgets design using custom styles and images
+
+    :copyright: (c) 2020-2021 by Mahmoud Elshahat.
+
+    module description:
+        one frame-rate-limited timer that drives all animated widgets, instead of a separate "after" loop per widget
+
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+from collections import deque
+
+
+class AnimationClock:
+    """run registered callbacks in batches from a single "after" loop
+
+    - repeating callbacks run every interval, one-shot callbacks run once after a delay, same as "after"
+    - callbacks that are due in the same frame run together in one tick
+    - tick is scheduled for the earliest due callback, and never faster than fps
+    - if a tick runs late, missed frames are dropped instead of running many ticks in a burst
+    - clock stops when there are no callbacks, and starts again when a callback is added
+    - a callback that raise an error is removed, tkinter errors are ignored since they usually mean widget is destroyed
+    - post() can be called from any thread, on unix tkinter thread is woken up through a pipe, on other systems
+      callbacks posted from other threads are collected by a light "after" loop every inbox_interval, which does not
+      keep the clock ticking
+
+    widgets that get updates from other threads should post a flush callback when work is queued, instead of adding
+    a repeating callback that checks their queue every frame
+
+    Example:
+        clock = get_clock(root)
+        key = clock.add(bar.step, interval=50)  # call bar.step() every 50 ms
+        clock.schedule(500, tip.showtip)  # call tip.showtip() once after 500 ms
+        clock.remove(key)
+
+        # from a worker thread
+        clock.post(0, bar.set, 50)
+    """
+
+    def __init__(self, root, fps=30, inbox_interval=50):
+        """initialize
+
+        Args:
+            root: tkinter root window, used to schedule ticks
+            fps (int): max. number of ticks per second
+            inbox_interval (int): milliseconds between inbox checks if tkinter file handlers are not supported
+        """
+        self.root = root
+        self.frame_time = 1 / fps  # seconds
+        self.callbacks = {}  # {key: [callback, args, interval in seconds or None for one-shot, due time]}
+        self.keys = itertools.count(1)
+        self.tick_id = None
+        self.next_tick = 0  # time of scheduled tick
+        self.ticks = 0  # number of ticks
+        self.late_ticks = 0  # ticks that started one frame or more after their time
+
+        # callbacks posted from other threads
+        self.tk_thread = threading.get_ident()
+        self.inbox = deque()  # (delay, callback, args)
+        self.signalled = False  # wakeup byte written and not read yet
+        self.wakeup_fds = None
+        if hasattr(root.tk, 'createfilehandler') and hasattr(os, 'set_blocking'):
+            read_fd, write_fd = os.pipe()
+            os.set_blocking(read_fd, False)
+            root.tk.createfilehandler(read_fd, tk.READABLE, lambda *args: self.read_inbox())
+            self.wakeup_fds = read_fd, write_fd
+        else:
+            # no file handlers, e.g. on windows, tkinter thread can't be woken up safely from another thread
+            self.inbox_interval = inbox_interval
+            self.root.after(inbox_interval, self.poll_inbox)
+
+    def set_fps(self, fps):
+        """change max. number of ticks per second"""
+        self.frame_time = 1 / fps
+
+    def add(self, callback, *args, interval=0):
+        """run callback repeatedly
+
+        Args:
+            callback (callable): function to call
+            args: callback arguments
+            interval (int): milliseconds between calls, 0 means every frame
+
+        Returns:
+            (int): key used to remove callback
+        """
+        interval /= 1000
+        return self._add([callback, args, interval, time.monotonic() + interval])
+
+    def schedule(self, delay, callback, *args):
+        """run callback once after delay, same as tkinter "after"
+
+        Args:
+            delay (int): milliseconds
+            callback (callable): function to call
+            args: callback arguments
+
+        Returns:
+            (int): key used to cancel callback
+        """
+        return self._add([callback, args, None, time.monotonic() + delay / 1000])
+
+    def post(self, delay, callback, *args):
+        """run callback once after delay, same as schedule() but safe to be called from any thread
+
+        callbacks posted from other threads can't be canceled, a flag could be checked by callback instead
+
+        Args:
+            delay (int): milliseconds
+            callback (callable): function to call
+            args: callback arguments
+        """
+        if threading.get_ident() == self.tk_thread:
+            self.schedule(delay, callback, *args)
+            return
+
+        self.inbox.append((delay, callback, args))
+
+        # wake up tkinter thread once for all callbacks posted before it reads inbox
+        if not self.signalled:
+            self.signalled = True
+            if self.wakeup_fds:
+                os.write(self.wakeup_fds[1], b'\0')
+
+    def read_inbox(self):
+        """schedule callbacks posted from other threads, runs on tkinter thread"""
+        # reset flag before reading, a callback posted meanwhile will signal again or be read in this call
+        self.signalled = False
+        if self.wakeup_fds:
+            try:
+                os.read(self.wakeup_fds[0], 4096)
+            except BlockingIOError:
+                pass
+
+        while self.inbox:
+            delay, callback, args = self.inbox.popleft()
+            self.schedule(delay, callback, *args)
+
+    def poll_inbox(self):
+        """check inbox periodically, used when there is no wakeup pipe"""
+        if self.inbox:
+            self.read_inbox()
+        self.root.after(self.inbox_interval, self.poll_inbox)
+
+    def remove(self, key):
+        """remove repeating callback or cancel one-shot callback"""
+        self.callbacks.pop(key, None)
+
+    cancel = remove
+
+    def _add(self, item):
+        key = next(self.keys)
+        self.callbacks[key] = item
+
+        # a tick scheduled for a far callback should not delay the new one
+        if self.tick_id and item[3] < self.next_tick - self.frame_time:
+            self.root.after_cancel(self.tick_id)
+            self.tick_id = None
+
+        self.start_ticking()
+        return key
+
+    def start_ticking(self):
+        """schedule next tick, if there are callbacks"""
+        if self.tick_id or not self.callbacks:
+            return
+
+        now = time.monotonic()
+        earliest = min(item[3] for item in self.callbacks.values())
+        next_tick = max(self.next_tick + self.frame_time, earliest)
+
+        # running late, continue from now and drop missed frames
+        next_tick = max(next_tick, now)
+
+        self.next_tick = next_tick
+        self.tick_id = self.root.after(round((next_tick - now) * 1000), self.tick)
+
+    def tick(self):
+        """run all due callbacks in one batch"""
+        self.tick_id = None
+        start = time.monotonic()
+        self.ticks += 1
+        if start - self.next_tick >= self.frame_time:
+            self.late_ticks += 1
+
+        # "after" has a millisecond resolution, callbacks due within half a frame will run in this tick
+        limit = start + self.frame_time / 2
+        due = [(key, item) for key, item in self.callbacks.items() if item[3] <= limit]
+
+        for key, item in due:
+            # callback removed by another callback
+            if self.callbacks.get(key) is not item:
+                continue
+
+            callback, args, interval, due_time = item
+            if interval is None:
+                del self.callbacks[key]
+            else:
+                # skip missed calls instead of running them in a burst
+                item[3] = max(due_time + interval, start)
+
+            try:
+                callback(*args)
+            except tk.TclError:
+                self.callbacks.pop(key, None)
+            except Exception:
+                self.callbacks.pop(key, None)
+                self.root.report_callback_exception(*sys.exc_info())
+
+        self.start_ticking()
+
+
+class FlushQueue:
+    """items queued from any thread and handed to a flush function in one batch on tkinter thread
+
+    the first item queued after a flush posts the flush function to the animation clock, items queued before it runs
+    join the same batch, nothing is scheduled while the queue is empty
+
+    Example:
+        def show_lines(lines):
+            text.insert('end', ''.join(lines))
+
+        lines = FlushQueue(text, show_lines)
+
+        # from any thread
+        lines.put('hello\n')
+    """
+
+    def __init__(self, widget, flush, delay=0):
+        """initialize
+
+        Args:
+            widget: any tkinter widget, used to get animation clock
+            flush (callable): function that accept a list of queued items, called on tkinter thread
+            delay (int): milliseconds between first queued item and flush, e.g. one frame to collect more items
+        """
+        self.flush = flush
+        self.delay = delay
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.posted = False  # flush is scheduled for queued items
+        self.clock = get_clock(widget)
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, item):
+        """queue an item, safe to be called from any thread"""
+        with self.lock:
+            self.items.append(item)
+            if self.posted:
+                return
+            self.posted = True
+
+        self.clock.post(self.delay, self.run)
+
+    def run(self):
+        """hand all queued items to flush function, runs on tkinter thread"""
+        with self.lock:
+            self.posted = False
+            items = list(self.items)
+            self.items.clear()
+
+        if items:
+            self.flush(items)
+
+
+def get_clock(widget):
+    """get animation clock shared by all widgets of the same root window, clock will be created if not exist"""
+    root = widget._root()
+    clock = getattr(root, 'animation_clock', None)
+    if clock is None:
+        clock = root.animation_clock = AnimationClock(root)
+    return clock
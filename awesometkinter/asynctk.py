@@ -0,0 +1,191 @@
+"""
+    AwesomeTkinter, a new tkinter widgets design using custom styles and images
+
+    :copyright: (c) 2020-2021 by Mahmoud Elshahat.
+
+    module description:
+        run asyncio event loop cooperatively with tkinter mainloop in the same thread, asyncio loop runs one step
+        only when it has work, i.e. one of its sockets is ready, a timer is due, or a callback is waiting
+
+"""
+
+import asyncio
+import math
+import tkinter as tk
+
+if not __package__:
+    __package__ = 'awesometkinter'
+
+from .datepicker import DatePicker
+from .dialog import FileDialog
+
+
+class AsyncTk:
+    """drive an asyncio event loop from tkinter mainloop
+
+    - on unix, tkinter watches asyncio selector file descriptor, so any ready socket wakes asyncio loop immediately
+    - next asyncio timer is scheduled with tkinter "after"
+    - if selector has no file descriptor, e.g. on windows, loop will be polled every "poll_interval" as well
+
+    coroutines run on tkinter thread, so they can update widgets directly
+
+    Example:
+        root = tk.Tk()
+        atk_async = AsyncTk(root)
+
+        async def download(bar):
+            async for progress in fetch():
+                bar.set(progress)
+
+        atk_async.create_task(download(bar))
+        root.mainloop()
+    """
+
+    def __init__(self, root, loop=None, poll_interval=50):
+        """initialize
+
+        Args:
+            root: tkinter root window
+            loop: asyncio event loop, a new loop will be created if omitted
+            poll_interval (int): milliseconds between loop steps if file descriptor watching is not available
+        """
+        self.root = root
+        self.loop = loop or asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.poll_interval = poll_interval
+        self.step_id = None
+        self.step_time = None  # loop time of scheduled step
+
+        # watch selector file descriptor
+        self.fd = None
+        selector = getattr(self.loop, '_selector', None)
+        fileno = getattr(selector, 'fileno', None)
+        if fileno and hasattr(root.tk, 'createfilehandler'):
+            self.fd = fileno()
+            root.tk.createfilehandler(self.fd, tk.READABLE, lambda *args: self.wakeup())
+
+        root.asynctk = self
+        self.wakeup()
+
+    def wakeup(self, delay=0):
+        """run a loop step after delay in milliseconds, e.g. after a future is set from a tkinter callback"""
+        when = self.loop.time() + delay / 1000
+        if self.step_id:
+            if self.step_time <= when:
+                return
+            self.root.after_cancel(self.step_id)
+
+        self.step_time = when
+        self.step_id = self.root.after(delay, self.step)
+
+    def step(self):
+        """run ready callbacks and I/O events once, without blocking"""
+        self.step_id = None
+
+        # loop is already running, e.g. a coroutine opened a blocking dialog with a nested tkinter loop
+        if self.loop.is_running() or self.loop.is_closed():
+            return
+
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+        delay = self.next_delay()
+        if delay is not None:
+            self.wakeup(delay)
+
+    def next_delay(self):
+        """milliseconds until asyncio loop has work to do, None if there is nothing to wait for"""
+        if getattr(self.loop, '_ready', None):
+            return 0
+
+        scheduled = getattr(self.loop, '_scheduled', None)
+        if scheduled is None:
+            return self.poll_interval
+
+        delay = None
+        if scheduled:
+            delay = max(math.ceil((scheduled[0].when() - self.loop.time()) * 1000), 0)
+
+        # without file descriptor watching, I/O events will be checked by polling
+        if self.fd is None:
+            delay = self.poll_interval if delay is None else min(delay, self.poll_interval)
+
+        return delay
+
+    def create_task(self, coro):
+        """schedule a coroutine to run in asyncio loop
+
+        Returns:
+            (asyncio.Task): task object
+        """
+        task = self.loop.create_task(coro)
+        self.wakeup()
+        return task
+
+    def set_result(self, future, result):
+        """set future result from a tkinter callback and wake up the loop"""
+        if not future.done():
+            future.set_result(result)
+        self.wakeup()
+
+    def close(self):
+        """stop driving asyncio loop, loop itself is not closed"""
+        if self.fd is not None:
+            self.root.tk.deletefilehandler(self.fd)
+            self.fd = None
+
+        if self.step_id:
+            self.root.after_cancel(self.step_id)
+            self.step_id = None
+
+
+def get_asynctk(widget):
+    """get AsyncTk object of widget's root window"""
+    root = widget._root()
+    asynctk = getattr(root, 'asynctk', None)
+    if asynctk is None:
+        raise RuntimeError('asyncio integration is not started, use AsyncTk(root) first')
+    return asynctk
+
+
+async def ask_date(master, **kwargs):
+    """show a DatePicker window and wait for selected date without blocking asyncio loop
+
+    Args:
+        master: parent window
+        kwargs: DatePicker parameters, e.g. year, month, day
+
+    Returns:
+        (datetime.datetime): selected date or None if window closed
+    """
+    asynctk = get_asynctk(master)
+    future = asynctk.loop.create_future()
+    DatePicker(master, wait=False, callback=lambda date: asynctk.set_result(future, date), **kwargs)
+    return await future
+
+
+async def ask_path(master=None, initialdir='', foldersonly=False, backend=None):
+    """show a file chooser and wait for selected path without blocking tkinter or asyncio loop
+
+    external choosers, e.g. zenity or kdialog, run in a separate process, tkinter file chooser is modal and both loops
+    will wait until it is closed
+
+    Args:
+        master: any tkinter widget, default is tkinter default root
+        initialdir (str): initial folder
+        foldersonly (bool): select a folder instead of a file
+        backend (str): 'zenity', 'kdialog', or 'TK', default is first available
+
+    Returns:
+        (str): selected path, or initialdir if canceled
+    """
+    master = master or tk._default_root
+    if master is None:
+        raise RuntimeError('no tkinter root window, create tk.Tk() first or pass master')
+
+    # result is delivered on tkinter thread, and asyncio loop must be driven by tkinter to receive it
+    get_asynctk(master)
+    future = FileDialog(foldersonly=foldersonly).run_async(master, initialdir=initialdir, backend=backend)
+
+    # external choosers return an empty string and tkinter chooser returns an empty string or tuple when canceled
+    return await asyncio.wrap_future(future) or initialdir
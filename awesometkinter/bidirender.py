@@ -11,8 +11,11 @@
 
 import os
 import platform
+import itertools
 import tkinter as tk
+from tkinter import ttk
 import re
+import unicodedata
 from bidi.algorithm import get_display
 
 if not __package__:
@@ -28,111 +31,94 @@ FINAL = 4
 
 operating_system = platform.system()  # current operating system  ('Windows', 'Linux', 'Darwin')
 
-shapes_table = (
-    ('\u0621', '\uFE80', '', '', ''),  # (ء, ﺀ, , , ), 
-    ('\u0622', '\uFE81', '', '', '\uFE82'),  # (آ, ﺁ, , , ﺂ), 
-    ('\u0623', '\uFE83', '', '', '\uFE84'),  # (أ, ﺃ, , , ﺄ), 
-    ('\u0624', '\uFE85', '', '', '\uFE86'),  # (ؤ, ﺅ, , , ﺆ), 
-    ('\u0625', '\uFE87', '', '', '\uFE88'),  # (إ, ﺇ, , , ﺈ), 
-    ('\u0626', '\uFE89', '\uFE8B', '\uFE8C', '\uFE8A'),  # (ئ, ﺉ, ﺋ, ﺌ, ﺊ), 
-    ('\u0627', '\uFE8D', '', '', '\uFE8E'),  # (ا, ﺍ, , , ﺎ), 
-    ('\u0628', '\uFE8F', '\uFE91', '\uFE92', '\uFE90'),  # (ب, ﺏ, ﺑ, ﺒ, ﺐ), 
-    ('\u0629', '\uFE93', '', '', '\uFE94'),  # (ة, ﺓ, , , ﺔ), 
-    ('\u062A', '\uFE95', '\uFE97', '\uFE98', '\uFE96'),  # (ت, ﺕ, ﺗ, ﺘ, ﺖ), 
-    ('\u062B', '\uFE99', '\uFE9B', '\uFE9C', '\uFE9A'),  # (ث, ﺙ, ﺛ, ﺜ, ﺚ), 
-    ('\u062C', '\uFE9D', '\uFE9F', '\uFEA0', '\uFE9E'),  # (ج, ﺝ, ﺟ, ﺠ, ﺞ), 
-    ('\u062D', '\uFEA1', '\uFEA3', '\uFEA4', '\uFEA2'),  # (ح, ﺡ, ﺣ, ﺤ, ﺢ), 
-    ('\u062E', '\uFEA5', '\uFEA7', '\uFEA8', '\uFEA6'),  # (خ, ﺥ, ﺧ, ﺨ, ﺦ), 
-    ('\u062F', '\uFEA9', '', '', '\uFEAA'),  # (د, ﺩ, , , ﺪ), 
-    ('\u0630', '\uFEAB', '', '', '\uFEAC'),  # (ذ, ﺫ, , , ﺬ), 
-    ('\u0631', '\uFEAD', '', '', '\uFEAE'),  # (ر, ﺭ, , , ﺮ), 
-    ('\u0632', '\uFEAF', '', '', '\uFEB0'),  # (ز, ﺯ, , , ﺰ), 
-    ('\u0633', '\uFEB1', '\uFEB3', '\uFEB4', '\uFEB2'),  # (س, ﺱ, ﺳ, ﺴ, ﺲ), 
-    ('\u0634', '\uFEB5', '\uFEB7', '\uFEB8', '\uFEB6'),  # (ش, ﺵ, ﺷ, ﺸ, ﺶ), 
-    ('\u0635', '\uFEB9', '\uFEBB', '\uFEBC', '\uFEBA'),  # (ص, ﺹ, ﺻ, ﺼ, ﺺ), 
-    ('\u0636', '\uFEBD', '\uFEBF', '\uFEC0', '\uFEBE'),  # (ض, ﺽ, ﺿ, ﻀ, ﺾ), 
-    ('\u0637', '\uFEC1', '\uFEC3', '\uFEC4', '\uFEC2'),  # (ط, ﻁ, ﻃ, ﻄ, ﻂ), 
-    ('\u0638', '\uFEC5', '\uFEC7', '\uFEC8', '\uFEC6'),  # (ظ, ﻅ, ﻇ, ﻈ, ﻆ), 
-    ('\u0639', '\uFEC9', '\uFECB', '\uFECC', '\uFECA'),  # (ع, ﻉ, ﻋ, ﻌ, ﻊ), 
-    ('\u063A', '\uFECD', '\uFECF', '\uFED0', '\uFECE'),  # (غ, ﻍ, ﻏ, ﻐ, ﻎ), 
-    ('\u0640', '\u0640', '\u0640', '\u0640', '\u0640'),  # (ـ, ـ, ـ, ـ, ـ),  Arabic Tatweel
-    ('\u0641', '\uFED1', '\uFED3', '\uFED4', '\uFED2'),  # (ف, ﻑ, ﻓ, ﻔ, ﻒ), 
-    ('\u0642', '\uFED5', '\uFED7', '\uFED8', '\uFED6'),  # (ق, ﻕ, ﻗ, ﻘ, ﻖ), 
-    ('\u0643', '\uFED9', '\uFEDB', '\uFEDC', '\uFEDA'),  # (ك, ﻙ, ﻛ, ﻜ, ﻚ), 
-    ('\u0644', '\uFEDD', '\uFEDF', '\uFEE0', '\uFEDE'),  # (ل, ﻝ, ﻟ, ﻠ, ﻞ), 
-    ('\u0645', '\uFEE1', '\uFEE3', '\uFEE4', '\uFEE2'),  # (م, ﻡ, ﻣ, ﻤ, ﻢ), 
-    ('\u0646', '\uFEE5', '\uFEE7', '\uFEE8', '\uFEE6'),  # (ن, ﻥ, ﻧ, ﻨ, ﻦ), 
-    ('\u0647', '\uFEE9', '\uFEEB', '\uFEEC', '\uFEEA'),  # (ه, ﻩ, ﻫ, ﻬ, ﻪ), 
-    ('\u0648', '\uFEED', '', '', '\uFEEE'),  # (و, ﻭ, , , ﻮ), 
-    # ('\u0649', '\uFEEF', '\uFBE8', '\uFBE9', '\uFEF0'),  # (ى, ﻯ, ﯨ, ﯩ, ﻰ), 
-    ('\u0649', '\uFEEF', '', '', '\uFEF0'),  # (ى, ﻯ, , , ﻰ),
-    ('\u064A', '\uFEF1', '\uFEF3', '\uFEF4', '\uFEF2'),  # (ي, ﻱ, ﻳ, ﻴ, ﻲ), 
-    ('\u0671', '\uFB50', '', '', '\uFB51'),  # (ٱ, ﭐ, , , ﭑ), 
-    ('\u0677', '\uFBDD', '', '', ''),  # (ٷ, ﯝ, , , ), 
-    ('\u0679', '\uFB66', '\uFB68', '\uFB69', '\uFB67'),  # (ٹ, ﭦ, ﭨ, ﭩ, ﭧ), 
-    ('\u067A', '\uFB5E', '\uFB60', '\uFB61', '\uFB5F'),  # (ٺ, ﭞ, ﭠ, ﭡ, ﭟ), 
-    ('\u067B', '\uFB52', '\uFB54', '\uFB55', '\uFB53'),  # (ٻ, ﭒ, ﭔ, ﭕ, ﭓ), 
-    ('\u067E', '\uFB56', '\uFB58', '\uFB59', '\uFB57'),  # (پ, ﭖ, ﭘ, ﭙ, ﭗ), 
-    ('\u067F', '\uFB62', '\uFB64', '\uFB65', '\uFB63'),  # (ٿ, ﭢ, ﭤ, ﭥ, ﭣ), 
-    ('\u0680', '\uFB5A', '\uFB5C', '\uFB5D', '\uFB5B'),  # (ڀ, ﭚ, ﭜ, ﭝ, ﭛ), 
-    ('\u0683', '\uFB76', '\uFB78', '\uFB79', '\uFB77'),  # (ڃ, ﭶ, ﭸ, ﭹ, ﭷ), 
-    ('\u0684', '\uFB72', '\uFB74', '\uFB75', '\uFB73'),  # (ڄ, ﭲ, ﭴ, ﭵ, ﭳ), 
-    ('\u0686', '\uFB7A', '\uFB7C', '\uFB7D', '\uFB7B'),  # (چ, ﭺ, ﭼ, ﭽ, ﭻ), 
-    ('\u0687', '\uFB7E', '\uFB80', '\uFB81', '\uFB7F'),  # (ڇ, ﭾ, ﮀ, ﮁ, ﭿ), 
-    ('\u0688', '\uFB88', '', '', '\uFB89'),  # (ڈ, ﮈ, , , ﮉ), 
-    ('\u068C', '\uFB84', '', '', '\uFB85'),  # (ڌ, ﮄ, , , ﮅ), 
-    ('\u068D', '\uFB82', '', '', '\uFB83'),  # (ڍ, ﮂ, , , ﮃ), 
-    ('\u068E', '\uFB86', '', '', '\uFB87'),  # (ڎ, ﮆ, , , ﮇ), 
-    ('\u0691', '\uFB8C', '', '', '\uFB8D'),  # (ڑ, ﮌ, , , ﮍ), 
-    ('\u0698', '\uFB8A', '', '', '\uFB8B'),  # (ژ, ﮊ, , , ﮋ), 
-    ('\u06A4', '\uFB6A', '\uFB6C', '\uFB6D', '\uFB6B'),  # (ڤ, ﭪ, ﭬ, ﭭ, ﭫ), 
-    ('\u06A6', '\uFB6E', '\uFB70', '\uFB71', '\uFB6F'),  # (ڦ, ﭮ, ﭰ, ﭱ, ﭯ), 
-    ('\u06A9', '\uFB8E', '\uFB90', '\uFB91', '\uFB8F'),  # (ک, ﮎ, ﮐ, ﮑ, ﮏ), 
-    ('\u06AD', '\uFBD3', '\uFBD5', '\uFBD6', '\uFBD4'),  # (ڭ, ﯓ, ﯕ, ﯖ, ﯔ), 
-    ('\u06AF', '\uFB92', '\uFB94', '\uFB95', '\uFB93'),  # (گ, ﮒ, ﮔ, ﮕ, ﮓ), 
-    ('\u06B1', '\uFB9A', '\uFB9C', '\uFB9D', '\uFB9B'),  # (ڱ, ﮚ, ﮜ, ﮝ, ﮛ), 
-    ('\u06B3', '\uFB96', '\uFB98', '\uFB99', '\uFB97'),  # (ڳ, ﮖ, ﮘ, ﮙ, ﮗ), 
-    ('\u06BA', '\uFB9E', '', '', '\uFB9F'),  # (ں, ﮞ, , , ﮟ), 
-    ('\u06BB', '\uFBA0', '\uFBA2', '\uFBA3', '\uFBA1'),  # (ڻ, ﮠ, ﮢ, ﮣ, ﮡ), 
-    ('\u06BE', '\uFBAA', '\uFBAC', '\uFBAD', '\uFBAB'),  # (ھ, ﮪ, ﮬ, ﮭ, ﮫ), 
-    ('\u06C0', '\uFBA4', '', '', '\uFBA5'),  # (ۀ, ﮤ, , , ﮥ), 
-    ('\u06C1', '\uFBA6', '\uFBA8', '\uFBA9', '\uFBA7'),  # (ہ, ﮦ, ﮨ, ﮩ, ﮧ), 
-    ('\u06C5', '\uFBE0', '', '', '\uFBE1'),  # (ۅ, ﯠ, , , ﯡ), 
-    ('\u06C6', '\uFBD9', '', '', '\uFBDA'),  # (ۆ, ﯙ, , , ﯚ), 
-    ('\u06C7', '\uFBD7', '', '', '\uFBD8'),  # (ۇ, ﯗ, , , ﯘ), 
-    ('\u06C8', '\uFBDB', '', '', '\uFBDC'),  # (ۈ, ﯛ, , , ﯜ), 
-    ('\u06C9', '\uFBE2', '', '', '\uFBE3'),  # (ۉ, ﯢ, , , ﯣ), 
-    ('\u06CB', '\uFBDE', '', '', '\uFBDF'),  # (ۋ, ﯞ, , , ﯟ), 
-    ('\u06CC', '\uFBFC', '\uFBFE', '\uFBFF', '\uFBFD'),  # (ی, ﯼ, ﯾ, ﯿ, ﯽ), 
-    ('\u06D0', '\uFBE4', '\uFBE6', '\uFBE7', '\uFBE5'),  # (ې, ﯤ, ﯦ, ﯧ, ﯥ), 
-    ('\u06D2', '\uFBAE', '', '', '\uFBAF'),  # (ے, ﮮ, , , ﮯ), 
-    ('\u06D3', '\uFBB0', '', '', '\uFBB1'),  # (ۓ, ﮰ, , , ﮱ), 
-    ('\uFEFB', '\uFEFB', '', '', '\uFEFC'),  # (ﻻ, ﻻ, , , ﻼ), 
-    ('\uFEF7', '\uFEF7', '', '', '\uFEF8'),  # (ﻷ, ﻷ, , , ﻸ), 
-    ('\uFEF5', '\uFEF5', '', '', '\uFEF6'),  # (ﻵ, ﻵ, , , ﻶ),
-    ('\uFEF9', '\uFEF9', '', '', '\uFEFA'),  # (ﻹ, ﻹ, , , ﻺ),
-)
+JOINING_TYPES = ('U', 'R', 'D', 'C', 'T')  # non-joining, right-joining, dual-joining, join-causing, transparent
+
+ZWNJ = '\u200C'  # zero width non-joiner
+ZWJ = '\u200D'  # zero width joiner
+TATWEEL = '\u0640'
+LAM = '\u0644'
+ALEFS = ('\u0622', '\u0623', '\u0625', '\u0627')  # alef letters that join with lam in a mandatory ligature
+
+
+def generate_shaping_tables():
+    """generate arabic-script shaping tables from unicode character database
+
+    every presentation form in "Arabic Presentation Forms-A" and "Arabic Presentation Forms-B" blocks has a
+    decomposition like '<initial> 0628', it is used to get all shapes of a letter, a letter with initial or medial
+    shapes is dual-joining, a letter with only final shape is right-joining.
+
+    Returns:
+        (tuple): shapes_table, shapes_map, joining_types, mandatory_liga_table, derender_table
+    """
+
+    positions = {'<isolated>': ISOLATED, '<initial>': INITIAL, '<medial>': MEDIAL, '<final>': FINAL}
+    letters = {}  # {base letter: [base letter, isolated, initial, medial, final]}
+    ligatures = {}  # {alef: [ligature, isolated, '', '', final]}
+
+    for code in itertools.chain(range(0xFB50, 0xFE00), range(0xFE70, 0xFEFF)):
+        form = chr(code)
+        tag, *chars = unicodedata.decomposition(form).split() or ['']
+        if tag not in positions:
+            continue
+
+        chars = ''.join(chr(int(x, 16)) for x in chars)
+
+        if len(chars) == 1:
+            shapes = letters.setdefault(chars, [chars, '', '', '', ''])
+        elif len(chars) == 2 and chars[0] == LAM and chars[1] in ALEFS:
+            # lam-alef ligature, its isolated form is used as a base letter
+            shapes = ligatures.setdefault(chars[1], ['', '', '', '', ''])
+            if tag == '<isolated>':
+                shapes[UNSHAPED] = form
+        else:
+            continue
+
+        # some letters have more than one form for the same position, e.g. compatibility forms, keep first one
+        shapes[positions[tag]] = shapes[positions[tag]] or form
+
+    letters[TATWEEL] = [TATWEEL] * 5
+
+    table = sorted(tuple(x) for x in letters.values()) + [tuple(x) for x in ligatures.values()]
+
+    shapes_map = {}  # map every shape of a letter to all its shapes
+    joining_types = {TATWEEL: 'C', ZWJ: 'C', ZWNJ: 'U'}
+    derender_table = {}  # map every presentation form to its base letter(s) in visual order
+
+    for shapes in table:
+        base = shapes[UNSHAPED]
+        if base == TATWEEL:
+            jt = 'C'
+        elif shapes[INITIAL] or shapes[MEDIAL]:
+            jt = 'D'
+        elif shapes[FINAL]:
+            jt = 'R'
+        else:
+            jt = 'U'
+
+        for form in filter(None, shapes):
+            shapes_map[form] = shapes
+            joining_types[form] = jt
+            if form != base:
+                derender_table[ord(form)] = base
+
+    # mandatory lam-alef ligatures, e.g. ('ﻟ', 'ﺎ'): 'ﻻ', lam comes after alef in visual order
+    liga_table = {}
+    for alef, shapes in ligatures.items():
+        alef_final = letters[alef][FINAL]
+        liga_table[(letters[LAM][INITIAL], alef_final)] = shapes[ISOLATED]
+        liga_table[(letters[LAM][MEDIAL], alef_final)] = shapes[FINAL]
+        for form in filter(None, shapes):
+            derender_table[ord(form)] = alef + LAM
+
+    return tuple(table), shapes_map, joining_types, liga_table, derender_table
+
+
+shapes_table, shapes_map, joining_types, mandatory_liga_table, derender_table = generate_shaping_tables()
 
 unshaped_to_isolated = {x[UNSHAPED]: x[ISOLATED] for x in shapes_table}
+isolated_table = str.maketrans(unshaped_to_isolated)
 
-mandatory_liga_table = {
-    ('\uFEDF', '\uFE82'): '\uFEF5',  # ['ﻟ', 'ﺂ', 'ﻵ']
-    ('\uFEDF', '\uFE84'): '\uFEF7',  # ['ﻟ', 'ﺄ', 'ﻷ']
-    ('\uFEDF', '\uFE88'): '\uFEF9',  # ['ﻟ', 'ﺈ', 'ﻹ']
-    ('\uFEDF', '\uFE8E'): '\uFEFB',  # ['ﻟ', 'ﺎ', 'ﻻ']
-    ('\uFEE0', '\uFE82'): '\uFEF6',  # ['ﻠ', 'ﺂ', 'ﻶ']
-    ('\uFEE0', '\uFE84'): '\uFEF8',  # ['ﻠ', 'ﺄ', 'ﻸ']
-    ('\uFEE0', '\uFE88'): '\uFEFA',  # ['ﻠ', 'ﺈ', 'ﻺ']
-    ('\uFEE0', '\uFE8E'): '\uFEFC',  # ['ﻠ', 'ﺎ', 'ﻼ']
-}
-
-# lam = '\u0644'
-lamalif_to_alif = {
-    '\uFEF5': '\u0622',  # [ 'آ', 'ﻵ']
-    '\uFEF7': '\u0623',  # ['ﺃ', 'ﻷ']
-    '\uFEF9': '\u0625',  # [ 'ﺇ', 'ﻹ']
-    '\uFEFB': '\u0627',  # ['ﺍ', 'ﻻ']
-}
+lamalif_to_alif = {chr(k): v[0] for k, v in derender_table.items() if len(v) == 2}
 
 HARAKAT_RE = re.compile(
     '['
@@ -167,6 +153,7 @@ ARABIC_RE = re.compile(
 NUMBERS_RE = re.compile(
     '['
     '\u0660-\u0669'  # indic numbers
+    '\u06F0-\u06F9'  # persian numbers
     '\u0030-\u0039'  # arabic numbers
     ']',
 
@@ -188,11 +175,16 @@ def remove_harakat(text):
     return ''.join(result)
 
 
-def do_ligation(text):
+def do_ligation(text, logical=False):
     result = []
 
     for i, c in enumerate(text):
-        shape = mandatory_liga_table.get((c, text[i - 1]), None)
+        if not i:
+            shape = None
+        elif logical:
+            shape = mandatory_liga_table.get((text[i - 1], c), None)
+        else:
+            shape = mandatory_liga_table.get((c, text[i - 1]), None)
         if shape:
             result.pop()
             result.append(shape)
@@ -202,50 +194,57 @@ def do_ligation(text):
     return ''.join(result)
 
 
-def do_shaping(text):
-    def get_shapes(c):
-        # get all different letter shapes 
-        if c is None:
-            return {}
-        key = c
-        match = [v for v in shapes_table if key in v]
-        if match:
-            match = match[UNSHAPED]
-            return {ISOLATED: match[ISOLATED], INITIAL: match[INITIAL], MEDIAL: match[MEDIAL], FINAL: match[FINAL]}
+def joining_type(c):
+    """get unicode joining type of a character
+
+    Returns:
+        (str): 'U' non-joining, 'R' right-joining, 'D' dual-joining, 'C' join-causing, or 'T' transparent
+    """
+    jt = joining_types.get(c)
+    if jt:
+        return jt
+
+    # unlisted characters of general category Mn, Me, or Cf are transparent, e.g. harakat
+    return 'T' if unicodedata.category(c) in ('Mn', 'Me', 'Cf') else 'U'
+
+
+def do_shaping(text, logical=False):
+    """select proper shape for every arabic letter
+
+    Args:
+        text (str): input text
+        logical (bool): True if text in logical order, False if in visual order, where letter before "logically" is
+                        the one on its right side, and letter after is on its left side
+    """
+    step = 1 if logical else -1
+    types = [joining_type(c) for c in text]
+    count = len(text)
+
+    def neighbour_type(i, step):
+        # skip transparent characters
+        while 0 <= i < count and types[i] == 'T':
+            i += step
+        return types[i] if 0 <= i < count else 'U'
+
+    alternative = {MEDIAL: FINAL, INITIAL: ISOLATED, FINAL: ISOLATED, ISOLATED: ISOLATED}
+
+    t = list(text)
+    for i, c in enumerate(text):
+        jt = types[i]
+        if jt not in ('D', 'R'):
+            continue
+
+        joins_before = neighbour_type(i - step, -step) in ('D', 'C')
+        joins_after = jt == 'D' and neighbour_type(i + step, step) in ('D', 'R', 'C')
+
+        if joins_before:
+            position = MEDIAL if joins_after else FINAL
         else:
-            return {}
+            position = INITIAL if joins_after else ISOLATED
+
+        shapes = shapes_map[c]
+        t[i] = shapes[position] or shapes[alternative[position]] or c
 
-    def get_shape(c, right_char, left_char):
-        """get a proper letter shape
-        Args:
-            c: current letter
-            right_char: letter before
-            left_char: letter after
-        """
-        c_shapes = get_shapes(c)
-
-        if c_shapes and c_shapes.get(FINAL):
-            # letter is arabic
-            right_char_shapes = get_shapes(right_char)
-            left_char_shapes = get_shapes(left_char)
-
-            position = MEDIAL if right_char_shapes.get(MEDIAL) else INITIAL
-            alternative = {MEDIAL: FINAL, INITIAL: ISOLATED}
-            if not isarabic(left_char):
-                position = alternative[position]
-            elif not left_char_shapes.get(FINAL):
-                position = ISOLATED
-
-            c = c_shapes.get(position) or c_shapes.get(alternative[position])
-
-        return c
-
-    t = []
-    for i in range(len(text) - 1, -1, -1):
-        c = text[i]
-        right_char = text[i + 1] if i < len(text) - 1 else None
-        left_char = text[i - 1] if i > 0 else None
-        t.insert(0, get_shape(c, right_char, left_char))
     return ''.join(t)
 
 
@@ -258,7 +257,7 @@ def workaround_for_windows_auto_bidi(text):
     # todo: should find away to disable windows bidi completely
 
     # convert all unshaped letters to isolated to bypass windows auto-bidi 
-    text = ''.join([unshaped_to_isolated.get(c, c) for c in text])
+    text = text.translate(isolated_table)
 
     # remove arabic TATWEEL letter '\u0640', it has no isolated form
     text = text.replace('\u0640', '')
@@ -266,10 +265,10 @@ def workaround_for_windows_auto_bidi(text):
     return text
 
 
-def reshaper(text):
-    text = do_shaping(text)
-    text = do_ligation(text)
+def reshaper(text, logical=False):
     text = remove_harakat(text)
+    text = do_shaping(text, logical=logical)
+    text = do_ligation(text, logical=logical)
 
     if operating_system == 'Windows':
         text = workaround_for_windows_auto_bidi(text)
@@ -278,8 +277,9 @@ def reshaper(text):
 
 
 def render_bidi_text(text):
+    # shape before reordering, since bidi algorithm drops zero width joiner and non-joiner
+    text = reshaper(text, logical=True)
     text = get_display(text)
-    text = reshaper(text)
 
     return text
 
@@ -287,24 +287,11 @@ def render_bidi_text(text):
 def derender_bidi_text(text):
     # convert visual text to logical
 
-    # get unshaped characters
-    unshaped_text = []
-    for c in text:
-        match = [item[0] for item in shapes_table if c in item]
-        if match:
-            c = match[0]
-
-        # lam-alif decomposition
-        if c in lamalif_to_alif:
-            alif = lamalif_to_alif[c]
-            lam = '\u0644'
-            unshaped_text.append(alif)
-            c = lam
-
-        unshaped_text.append(c)
+    # get unshaped characters, lam-alef ligatures will be decomposed
+    unshaped_text = text.translate(derender_table)
 
     # reverse text order to its original state
-    text = get_display(''.join(unshaped_text))
+    text = get_display(unshaped_text)
 
     return text
 
@@ -491,10 +478,271 @@ def add_bidi_support_for_label(widget):
     widget.set = set_text
 
 
+def bind_lazy_rendering(widget, render_visible):
+    """call render_visible() whenever the visible rows of a scrollable widget change
+
+    widget's yscrollcommand is called by tkinter after every scroll, resize, insertion, or deletion, it will be
+    wrapped to schedule render_visible() once per idle cycle, a yscrollcommand set later e.g. by a scrollbar, either
+    by configure() or widget['yscrollcommand'] = ..., will be wrapped as well.
+
+    Args:
+        widget: tk.Listbox or ttk.Treeview
+        render_visible (callable): function that render rows currently shown in widget
+    """
+
+    widget.render_id = None
+
+    def on_idle():
+        widget.render_id = None
+        render_visible()
+
+    def schedule():
+        if widget.render_id is None:
+            widget.render_id = widget.after_idle(on_idle)
+
+    def wrap(command):
+        def yscrollcommand(*args):
+            if callable(command):
+                command(*args)
+            elif command:
+                # a tcl command string, e.g. '.!scrollbar set'
+                widget.tk.call(widget.tk.splitlist(command) + args)
+            schedule()
+        return yscrollcommand
+
+    # "_configure" name is used internally by tkinter
+    widget.original_configure = widget.configure
+
+    def configure(cnf=None, **kw):
+        if isinstance(cnf, str):
+            # query an option
+            return widget.original_configure(cnf)
+        kw.update(cnf or {})
+        if 'yscrollcommand' in kw:
+            kw['yscrollcommand'] = wrap(kw['yscrollcommand'])
+        return widget.original_configure(**kw)
+
+    # widget['yscrollcommand'] = ... calls widget.configure() as well
+    widget.configure = widget.config = configure
+    widget.configure(yscrollcommand=widget.cget('yscrollcommand'))
+    widget.schedule_rendering = schedule
+    widget.bind('<Configure>', lambda event: schedule(), add='+')
+
+
+def add_bidi_support_for_listbox(widget, ispath=False):
+    """add arabic support for a listbox widget
+
+    items are stored as logical text and rendered lazily when they scroll into view, rendered values are cached
+    per item, get() and selection_get() return logical text
+    """
+
+    widget.logical_items = []  # logical text of every item
+    widget.rendered_items = []  # rendered text of every item or None if not rendered yet
+
+    def render_visible():
+        count = len(widget.logical_items)
+        if not count:
+            return
+
+        first = widget.nearest(0)
+        last = widget.nearest(widget.winfo_height())
+        for i in range(max(first - 1, 0), min(last + 2, count)):
+            if widget.rendered_items[i] is not None:
+                continue
+
+            rendered = render_text(widget.logical_items[i], ispath=ispath)
+            widget.rendered_items[i] = rendered
+
+            if rendered != widget.logical_items[i]:
+                # replacing an item drops its selection and options, keep them
+                selected = tk.Listbox.selection_includes(widget, i)
+                options = {k: tk.Listbox.itemcget(widget, i, k) for k in ('background', 'foreground',
+                                                                          'selectbackground', 'selectforeground')}
+                tk.Listbox.delete(widget, i)
+                tk.Listbox.insert(widget, i, rendered)
+                tk.Listbox.itemconfigure(widget, i, **{k: v for k, v in options.items() if v})
+                if selected:
+                    tk.Listbox.selection_set(widget, i)
+
+    def insert(index, *elements):
+        index = tk.Listbox.index(widget, index)
+        elements = [str(x) for x in elements]
+        widget.logical_items[index:index] = elements
+        widget.rendered_items[index:index] = [None] * len(elements)
+
+        # insert logical text as a placeholder, visible rows will be rendered in next idle cycle
+        tk.Listbox.insert(widget, index, *elements)
+
+    def delete(first, last=None):
+        first = tk.Listbox.index(widget, first)
+        last = first if last is None else tk.Listbox.index(widget, last)
+        del widget.logical_items[first:last + 1]
+        del widget.rendered_items[first:last + 1]
+        tk.Listbox.delete(widget, first, last)
+
+    def get(first, last=None):
+        # out of range index, e.g. 'end', returns an empty string the same as tkinter
+        first = tk.Listbox.index(widget, first)
+        if last is None:
+            return widget.logical_items[first] if 0 <= first < len(widget.logical_items) else ''
+        last = tk.Listbox.index(widget, last)
+        return tuple(widget.logical_items[max(first, 0):last + 1])
+
+    def selection_get(**kw):
+        return '\n'.join(widget.logical_items[i] for i in widget.curselection())
+
+    def set_items(items):
+        delete(0, 'end')
+        insert(0, *items)
+
+    widget.insert = insert
+    widget.delete = delete
+    widget.get = get
+    widget.selection_get = selection_get
+    widget.set = set_items
+
+    # existing items
+    items = tk.Listbox.get(widget, 0, 'end')
+    if items:
+        set_items(items)
+
+    bind_lazy_rendering(widget, render_visible)
+
+
+def add_bidi_support_for_treeview(widget, ispath=False):
+    """add arabic support for a ttk.Treeview widget
+
+    item text and values are stored as logical text and rendered lazily when they scroll into view, rendered values
+    are cached per item, item() and set() return logical text
+    """
+
+    widget.logical_items = {}  # {iid: {'text': str, 'values': list}}
+    widget.rendered_iids = set()  # iids that has been rendered
+
+    tree = ttk.Treeview
+
+    def render(value):
+        return render_text(value, ispath=ispath) if isinstance(value, str) else value
+
+    def render_visible():
+        style = widget.cget('style') or 'Treeview'
+        try:
+            rowheight = int(ttk.Style().lookup(style, 'rowheight') or 20)
+        except ValueError:
+            rowheight = 20
+
+        # step half a row height to hit every visible row regardless of heading height
+        step = max(rowheight // 2, 1)
+        for y in range(0, widget.winfo_height() + step, step):
+            iid = widget.identify_row(y)
+            if not iid or iid in widget.rendered_iids or iid not in widget.logical_items:
+                continue
+
+            widget.rendered_iids.add(iid)
+            item = widget.logical_items[iid]
+            tree.item(widget, iid, text=render(item['text']), values=[render(v) for v in item['values']])
+
+    def store(iid, kw):
+        item = widget.logical_items.get(iid)
+        if item is None:
+            # item is not stored yet, start from its current text and values
+            item = widget.logical_items[iid] = {'text': tree.item(widget, iid, 'text'),
+                                                'values': list(tree.item(widget, iid, 'values') or [])}
+        if 'text' in kw:
+            item['text'] = kw['text']
+        if 'values' in kw:
+            values = kw['values']
+            item['values'] = [values] if isinstance(values, str) else list(values or [])
+        widget.rendered_iids.discard(iid)
+
+    def column_index(column):
+        columns = widget.cget('columns')
+        columns = columns.split() if isinstance(columns, str) else list(columns)
+        if column in columns:
+            return columns.index(column)
+        return int(str(column).lstrip('#')) - 1
+
+    def insert(parent, index, iid=None, **kw):
+        iid = tree.insert(widget, parent, index, iid=iid, **kw)
+        store(iid, kw)
+        return iid
+
+    def item(iid, option=None, **kw):
+        if kw:
+            store(iid, kw)
+            tree.item(widget, iid, option, **kw)
+            widget.schedule_rendering()
+            return
+
+        logical = widget.logical_items.get(iid)
+        if option is None:
+            info = tree.item(widget, iid)
+            if logical:
+                info.update(text=logical['text'], values=logical['values'])
+            return info
+        elif logical and option in ('text', 'values'):
+            return logical[option]
+        return tree.item(widget, iid, option)
+
+    def set_value(iid, column=None, value=None):
+        logical = widget.logical_items.get(iid)
+        if value is not None:
+            if logical is not None:
+                idx = column_index(column)
+                values = logical['values']
+                values.extend([''] * (idx + 1 - len(values)))
+                values[idx] = value
+                widget.rendered_iids.discard(iid)
+            tree.set(widget, iid, column, value)
+            widget.schedule_rendering()
+            return
+
+        if logical is None:
+            return tree.set(widget, iid, column)
+
+        if column is None:
+            columns = widget.cget('columns')
+            columns = columns.split() if isinstance(columns, str) else list(columns)
+            return {col: v for col, v in zip(columns, logical['values'])}
+
+        idx = column_index(column)
+        return logical['values'][idx] if idx < len(logical['values']) else ''
+
+    def forget(iid):
+        for child in tree.get_children(widget, iid):
+            forget(child)
+        widget.logical_items.pop(iid, None)
+        widget.rendered_iids.discard(iid)
+
+    def delete(*items):
+        for iid in items:
+            forget(iid)
+        tree.delete(widget, *items)
+
+    def capture(parent):
+        """store items inserted before bidi support is added"""
+        for child in tree.get_children(widget, parent):
+            store(child, {})
+            capture(child)
+
+    capture('')
+
+    widget.insert = insert
+    widget.item = item
+    widget.set = set_value
+    widget.delete = delete
+
+    bind_lazy_rendering(widget, render_visible)
+
+
 def add_bidi_support(widget, render_copy_paste=True, copy_paste_menu=False, ispath=False):
     """add bidi support for tkinter widget """
     if widget.winfo_class() == 'Label':
         add_bidi_support_for_label(widget)
+    elif widget.winfo_class() == 'Listbox':
+        add_bidi_support_for_listbox(widget, ispath=ispath)
+    elif widget.winfo_class() == 'Treeview':
+        add_bidi_support_for_treeview(widget, ispath=ispath)
     elif widget.winfo_class() == 'Entry':
         add_bidi_support_for_entry(widget)
         if render_copy_paste:
@@ -0,0 +1,363 @@
+"""
+    AwesomeTkinter, a new tkinter widgets design using custom styles and images
+
+    :copyright: (c) 2020-2021 by Mahmoud Elshahat.
+
+    module description:
+        in-process directory browser, folder contents are listed in a worker thread and shown in chunks, only visible
+        rows are drawn, it stays responsive with folders of 100k entries or slow network mounts
+
+"""
+
+import os
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import font as tkfont
+
+if not __package__:
+    __package__ = 'awesometkinter'
+
+from .utils import *
+from .animation import FlushQueue
+from .scrollbar import SimpleScrollbar
+from .bidirender import render_bidi_path
+from .telemetry import format_bytes
+
+
+class DirectoryBrowser(tk.Frame):
+    """browse folders and select a file or a folder
+
+    folder entries are listed by os.scandir() in a worker thread, and shown in chunks as they arrive, listing is
+    cached per folder and reused as long as folder modification time doesn't change, only the most recently used
+    "cache_size" folders are kept
+
+    rows are canvas text items, only visible rows exist, scrolling changes their text instead of moving them
+
+    keyboard: Up/Down to select, Return to open, BackSpace to go to parent folder
+
+    Example:
+        browser = DirectoryBrowser(root, path=os.path.expanduser('~'), command=print)
+        browser.pack(fill='both', expand=True)
+
+        print(browser.get())  # selected path
+    """
+
+    # class variables to be shared between objects
+    cache = OrderedDict()  # {folder path: (folder modification time, [(name, is_dir, size, mtime), ...])}
+    cache_lock = threading.Lock()
+    cache_size = 10  # max. number of cached folders
+
+    def __init__(self, parent, path='.', bg='white', fg='black', sbg=None, sbar_fg=None, sbar_bg=None,
+                 foldersonly=False, showhidden=False, autoscroll=False, chunk_size=500, command=None, font=None,
+                 vbar_width=10):
+        """initialize
+
+        Args:
+            parent: tkinter container
+            path (str): initial folder
+            bg (str): background color
+            fg (str): text color
+            sbg (str): selected row background
+            sbar_fg (str): color of scrollbar's slider
+            sbar_bg (str): color of scrollbar's trough
+            foldersonly (bool): show folders only
+            showhidden (bool): show entries that start with a dot
+            autoscroll (bool): keep showing last rows while listing if view is at the bottom
+            chunk_size (int): number of entries sent from worker thread at once
+            command (callable): a function to be called with file path when a file is opened by double-click or
+                                Return key
+            font (str): tkinter font, e.g. 'any 10'
+            vbar_width (int): vertical scrollbar width
+        """
+        self.bg = bg
+        self.fg = fg
+        self.sbg = sbg or calc_contrast_color(bg, 30)
+        self.foldersonly = foldersonly
+        self.showhidden = showhidden
+        self.autoscroll = autoscroll
+        self.chunk_size = chunk_size
+        self.command = command
+        self.font = font or 'TkDefaultFont'
+
+        self.path = None  # current folder
+        self.entries = []  # [(name, is_dir, size, mtime), ...] of current folder
+        self.listing = False  # True while worker thread is listing current folder
+        self.generation = 0  # incremented when folder changed, old workers stop when they notice
+        self.selected = None  # index of selected entry
+        self.top = 0  # index of first visible entry
+        self.pool = []  # canvas items for every visible row, [(rectangle, name text, size text), ...]
+        self.shown = []  # contents currently shown in every pool row
+
+        tk.Frame.__init__(self, parent, bg=bg)
+
+        self.row_height = tkfont.Font(font=self.font).metrics('linespace') + 4
+        self.scroll_step = 3  # rows per mousewheel step
+
+        self.path_label = tk.Label(self, bg=self.sbg, fg=calc_font_color(self.sbg), anchor='w', font=self.font)
+        self.path_label.pack(side='top', fill='x')
+        self.status_label = tk.Label(self, bg=bg, fg=fg, anchor='w', font=self.font)
+        self.status_label.pack(side='bottom', fill='x')
+
+        self.vbar = SimpleScrollbar(self, orient='vertical', command=self.yview, bg=sbar_bg, slider_color=sbar_fg,
+                                    width=vbar_width)
+        self.vbar.pack(side='right', fill='y')
+
+        self.canvas = tk.Canvas(self, bg=bg, bd=0, highlightthickness=0, takefocus=True)
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.canvas.bind('<Configure>', lambda event: self.render())
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<Double-Button-1>', lambda event: self.open_selected())
+        self.canvas.bind('<Return>', lambda event: self.open_selected())
+        self.canvas.bind('<BackSpace>', lambda event: self.go_up())
+        self.canvas.bind('<Up>', lambda event: self.select(max((self.selected or 0) - 1, 0)))
+        self.canvas.bind('<Down>', lambda event: self.select(0 if self.selected is None else self.selected + 1))
+        scroll_with_mousewheel(self.canvas, target=self)
+
+        self.chunks = FlushQueue(self, self.flush_chunks)  # (generation, chunk) sent by worker threads
+        self.bind('<Destroy>', self.on_destroy, add='+')
+
+        self.browse(path)
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.generation += 1
+
+    # listing ----------------------------------------------------------------------------------------------------------
+    def browse(self, path):
+        """show contents of a folder"""
+        path = os.path.abspath(path)
+        self.generation += 1
+        self.path = path
+        self.entries = []
+        self.selected = None
+        self.top = 0
+        self.listing = True
+        self.path_label.config(text=render_bidi_path(path))
+        self.update_status()
+        self.render()
+
+        threading.Thread(target=self.scan, args=(path, self.generation), daemon=True).start()
+
+    def refresh(self):
+        """list current folder again, ignoring cache"""
+        with DirectoryBrowser.cache_lock:
+            DirectoryBrowser.cache.pop(self.path, None)
+        self.browse(self.path)
+
+    def go_up(self):
+        """show parent folder"""
+        parent = os.path.dirname(self.path)
+        if parent != self.path:
+            self.browse(parent)
+
+    def scan(self, path, generation):
+        """list folder entries in chunks, runs in a worker thread"""
+        try:
+            folder_mtime = os.stat(path).st_mtime
+            cached = self.cache_get(path)
+            if cached and cached[0] == folder_mtime:
+                self.send(generation, cached[1])
+                self.send(generation, None)
+                return
+
+            entries = []
+            chunk = []
+            with os.scandir(path) as it:
+                for entry in it:
+                    # folder changed by user
+                    if generation != self.generation:
+                        return
+
+                    try:
+                        is_dir = entry.is_dir()
+                        st = entry.stat()
+                        chunk.append((entry.name, is_dir, 0 if is_dir else st.st_size, st.st_mtime))
+                    except OSError:
+                        chunk.append((entry.name, False, 0, 0))
+
+                    if len(chunk) >= self.chunk_size:
+                        self.send(generation, chunk)
+                        entries.extend(chunk)
+                        chunk = []
+
+            entries.extend(chunk)
+            self.send(generation, chunk)
+            self.cache_put(path, (folder_mtime, entries))
+
+        except OSError as e:
+            self.send(generation, e)
+
+        self.send(generation, None)
+
+    def send(self, generation, chunk):
+        """send a chunk to tkinter thread, flush_chunks() is scheduled once for all chunks sent before it runs"""
+        self.chunks.put((generation, chunk))
+
+    @classmethod
+    def cache_get(cls, path):
+        with cls.cache_lock:
+            cached = cls.cache.get(path)
+            if cached:
+                cls.cache.move_to_end(path)
+            return cached
+
+    @classmethod
+    def cache_put(cls, path, listing):
+        """store folder listing, least recently used folders are removed if cache is full"""
+        with cls.cache_lock:
+            cls.cache[path] = listing
+            cls.cache.move_to_end(path)
+            while len(cls.cache) > cls.cache_size:
+                cls.cache.popitem(last=False)
+
+    def accept(self, entry):
+        name, is_dir, _, _ = entry
+        return (is_dir or not self.foldersonly) and (self.showhidden or not name.startswith('.'))
+
+    def flush_chunks(self, chunks):
+        """show chunks sent by worker threads, runs on tkinter thread at most once per frame"""
+        # follow new entries if view is at the bottom, the same as ScrolledText autoscroll
+        follow = self.autoscroll and self.vbar.get()[1] == 1
+
+        for generation, chunk in chunks:
+            if generation != self.generation:
+                continue
+
+            if chunk is None:
+                self.finish_listing()
+            elif isinstance(chunk, Exception):
+                self.status_label.config(text=str(chunk))
+            else:
+                self.entries.extend(e for e in chunk if self.accept(e))
+
+        if follow:
+            self.top = self.max_top()
+
+        self.update_status()
+        self.render()
+
+    def finish_listing(self):
+        """sort entries, folders first"""
+        self.listing = False
+        selected = self.entries[self.selected] if self.selected is not None else None
+        self.entries.sort(key=lambda e: (not e[1], e[0].casefold()))
+        if selected:
+            self.selected = self.entries.index(selected)
+
+    def update_status(self):
+        text = f'{len(self.entries):,} items'
+        if self.listing:
+            text = 'Listing... ' + text
+        self.status_label.config(text=text)
+
+    # rendering --------------------------------------------------------------------------------------------------------
+    def visible_count(self):
+        return max(self.canvas.winfo_height(), 1) // self.row_height + 1
+
+    def max_top(self):
+        return max(len(self.entries) - self.visible_count() + 1, 0)
+
+    def render(self):
+        """draw visible rows, only rows with changed contents are updated"""
+        count = self.visible_count()
+        width = self.canvas.winfo_width()
+
+        # create missing rows
+        while len(self.pool) < count:
+            y = len(self.pool) * self.row_height
+            rect = self.canvas.create_rectangle(0, y, width, y + self.row_height, width=0, fill=self.bg)
+            name = self.canvas.create_text(5, y + self.row_height // 2, anchor='w', fill=self.fg, font=self.font)
+            size = self.canvas.create_text(width - 5, y + self.row_height // 2, anchor='e', fill=self.fg,
+                                           font=self.font)
+            self.pool.append((rect, name, size))
+            self.shown.append(None)
+
+        self.top = min(self.top, self.max_top())
+
+        for i, (rect, name, size) in enumerate(self.pool):
+            index = self.top + i
+            entry = self.entries[index] if index < len(self.entries) and i < count else None
+            contents = (entry, index == self.selected, width)
+            if contents == self.shown[i]:
+                continue
+            self.shown[i] = contents
+
+            y = i * self.row_height
+            self.canvas.coords(rect, 0, y, width, y + self.row_height)
+            self.canvas.coords(size, width - 5, y + self.row_height // 2)
+            self.canvas.itemconfig(rect, fill=self.sbg if entry and index == self.selected else self.bg)
+
+            if entry:
+                entry_name, is_dir, entry_size, _ = entry
+                self.canvas.itemconfig(name, text=render_bidi_path(entry_name) + (os.sep if is_dir else ''))
+                self.canvas.itemconfig(size, text='' if is_dir else format_bytes(entry_size))
+            else:
+                self.canvas.itemconfig(name, text='')
+                self.canvas.itemconfig(size, text='')
+
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.entries)
+        if total:
+            self.vbar.set(self.top / total, min((self.top + self.visible_count() - 1) / total, 1))
+        else:
+            self.vbar.set(0, 1)
+
+    # scrolling --------------------------------------------------------------------------------------------------------
+    def yview(self, *args):
+        """scrollbar command"""
+        if args[0] == 'moveto':
+            self.yview_moveto(float(args[1]))
+        elif args[0] == 'scroll':
+            self.yview_scroll(int(args[1]), args[2])
+
+    def yview_moveto(self, fraction):
+        self.top = max(min(int(fraction * len(self.entries)), self.max_top()), 0)
+        self.render()
+
+    def yview_scroll(self, number, what):
+        step = self.visible_count() - 1 if what.startswith('page') else self.scroll_step
+        self.top = max(min(self.top + number * step, self.max_top()), 0)
+        self.render()
+
+    def see(self, index):
+        """scroll to make entry at index visible"""
+        if index < self.top:
+            self.top = index
+        elif index > self.top + self.visible_count() - 2:
+            self.top = index - self.visible_count() + 2
+        self.render()
+
+    # selection --------------------------------------------------------------------------------------------------------
+    def on_click(self, event):
+        self.canvas.focus_set()
+        index = self.top + event.y // self.row_height
+        if index < len(self.entries):
+            self.select(index)
+
+    def select(self, index):
+        if not self.entries:
+            return
+        self.selected = min(max(index, 0), len(self.entries) - 1)
+        self.see(self.selected)
+
+    def get(self):
+        """get full path of selected entry, or current folder if nothing selected"""
+        if self.selected is None:
+            return self.path
+        return os.path.join(self.path, self.entries[self.selected][0])
+
+    def open_selected(self):
+        """browse selected folder, or call command with selected file"""
+        if self.selected is None:
+            return
+
+        name, is_dir, _, _ = self.entries[self.selected]
+        path = os.path.join(self.path, name)
+        if is_dir:
+            self.browse(path)
+        elif self.command:
+            self.command(path)
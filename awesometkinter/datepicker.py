@@ -16,11 +16,25 @@ from .utils import *
 
 
 class DatePicker(tk.Toplevel):
-    """Date picker window"""
+    """Date picker window
+
+    a reusable picker is hidden when closed instead of being destroyed, and can be shown again with show()
+
+    Example:
+        picker = DatePicker(root, reusable=True, wait=False)
+        selected_date = picker.show(datetime.datetime(2021, 5, 1))  # blocks until window closed
+
+        # or use a picker shared by all callers with the same master
+        selected_date = DatePicker.shared(root).show()
+    """
+
+    # class variable to be shared between objects
+    instances = {}  # {master: reusable DatePicker}, see shared()
 
     def __init__(self, master, min_year=None, max_year=None, year=None, month=None, day=None, hour=None, minute=None,
                  title='Date Picker', bg=None, fg=None, sbg=None,
-                 btnbg=None, btnfg=None, width=420, height=180):
+                 btnbg=None, btnfg=None, width=420, height=180, wait=True, callback=None, reusable=False,
+                 year_window=10, hidden=False):
         """initialize
 
         Args:
@@ -29,7 +43,17 @@ class DatePicker(tk.Toplevel):
             max_year (int): max. year to show
             year, month, day, hour, minute (int): set selected time
             title (str): window title
+            wait (bool): block until window closed, if False, selected date should be received thru callback
+            callback (callable): a function to be called with selected date or None when window closed
+            reusable (bool): hide window when closed instead of destroying it, use show() to show it again
+            year_window (int): number of years shown before and after selected year in year combobox, years list
+                               is moved around selected year every time combobox is opened, any year between
+                               min_year and max_year could be typed in year combobox as well
+            hidden (bool): create window withdrawn, use show() to display it, requires wait=False
         """
+        if hidden and wait:
+            raise ValueError('a hidden DatePicker can not wait, use wait=False then call show()')
+
         self.master = master
         master_bg = get_widget_attribute(master, 'background')
         self.bg = bg or calc_contrast_color(master_bg, 30)
@@ -40,26 +64,41 @@ class DatePicker(tk.Toplevel):
 
         today = datetime.datetime.today()
         year = year or today.year
-        min_year = min_year or year - 100
-        max_year = max_year or year + 100
+        self.min_year = min_year or year - 100
+        self.max_year = max_year or year + 100
+        year = self.clamp_year(year)
+        self.year_window = year_window
+        self.width = width
+        self.height = height
+        self.reusable = reusable
         month = month or today.month
         day = day or today.day
         hour = hour or today.hour
         minute = minute or today.minute
 
         self.selected_date = None
+        self.callback = callback
 
-        self.fields = {'Year': {'values': list(range(min_year, max_year + 1)), 'selection': year},
+        self.fields = {'Year': {'values': self.year_values(year), 'selection': year},
                        'Month': {'values': list(range(1, 13)), 'selection': month},
                        'Day': {'values': list(range(1, 32)), 'selection': day},
                        'Hour': {'values': list(range(0, 24)), 'selection': hour},
                        'Minute': {'values': list(range(0, 60)), 'selection': minute},
                        }
 
+        self.combos = {}  # {field name: combobox}
+
         # initialize super
         tk.Toplevel.__init__(self, self.master)
 
+        # withdraw before first idle, otherwise window will flash on screen
+        if hidden:
+            self.withdraw()
+
+        self.closed = tk.BooleanVar(self)  # written when window closed, used to wait for reusable picker
+
         # bind window close
+        self.protocol('WM_DELETE_WINDOW', self.close)
         center_window(self, width=width, height=height, reference=self.master)
 
         self.title(title)
@@ -67,7 +106,69 @@ class DatePicker(tk.Toplevel):
 
         self.create_widgets()
 
-        self.wait_window(self)
+        if wait:
+            self.wait()
+
+    @classmethod
+    def shared(cls, master, **kwargs):
+        """get a hidden reusable picker for master, it will be created once with kwargs, then reused
+
+        Returns:
+            (DatePicker): use its show() method to display it
+        """
+        picker = cls.instances.get(master)
+        if not picker or not picker.winfo_exists():
+            picker = cls(master, wait=False, reusable=True, hidden=True, **kwargs)
+            cls.instances[master] = picker
+        return picker
+
+    def wait(self):
+        """block until window closed"""
+        if self.reusable:
+            self.wait_variable(self.closed)
+        else:
+            self.wait_window(self)
+
+    def show(self, date=None, callback=None, wait=True):
+        """show a reusable picker again
+
+        Args:
+            date (datetime.datetime): preset date, default is current time
+            callback (callable): a function to be called with selected date or None when window closed,
+                                 if None, the callback given before is kept
+            wait (bool): block until window closed
+
+        Returns:
+            (datetime.datetime): selected date if wait is True, or None
+        """
+        date = date or datetime.datetime.today()
+        self.selected_date = None
+        if callback:
+            self.callback = callback
+
+        year = self.clamp_year(date.year)
+        for key, value in zip(self.fields, (year, date.month, date.day, date.hour, date.minute)):
+            self.fields[key]['selection'] = value
+            self.combos[key].set(value)
+        self.combos['Year'].config(values=self.year_values(year))
+        self.update_days()
+
+        center_window(self, width=self.width, height=self.height, reference=self.master)
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+
+        if wait:
+            self.wait()
+            return self.selected_date
+
+    def clamp_year(self, year):
+        """limit year to min_year and max_year"""
+        return min(max(year, self.min_year), self.max_year)
+
+    def year_values(self, year):
+        """years around selected year"""
+        return list(range(max(self.min_year, year - self.year_window), min(self.max_year, year + self.year_window) + 1))
 
     def is_leap(self, year):
         """year -> 1 if leap year, else 0, source: datetime.py"""
@@ -96,17 +197,7 @@ class DatePicker(tk.Toplevel):
         def set_field(field_name, value):
             x = self.fields[field_name]
             x['selection'] = int(value)
-
-            # set correct days according to month and year
-            year = self.fields['Year']['selection']
-            month = self.fields['Month']['selection']
-            day = self.fields['Day']['selection']
-            days_in_month = self.days_in_month(year, month)
-            day_combo.config(values=list(range(1, days_in_month + 1)))
-            if day > days_in_month:
-                corrected_value = days_in_month
-                day_combo.set(corrected_value)
-                self.fields['Day']['selection'] = corrected_value
+            self.update_days()
 
         # style
         s = ttk.Style()
@@ -134,10 +225,16 @@ class DatePicker(tk.Toplevel):
             cb.grid(row=1, column=c, padx=(5, 10), sticky='w')
             cb.callback = lambda field_name=key, combo=cb: set_field(field_name, combo.get())
             cb.bind('<<ComboboxSelected>>', on_selection)
+            self.combos[key] = cb
 
-            # get day combo box reference
-            if key == 'Day':
-                day_combo = cb
+            # move years list around selected year before showing dropdown menu, far years could be typed
+            if key == 'Year':
+                cb.config(state='normal', validate='key',
+                          validatecommand=(self.register(lambda text: text.isdigit() or not text), '%P'),
+                          postcommand=lambda combo=cb: combo.config(
+                              values=self.year_values(self.fields['Year']['selection'])))
+                cb.bind('<Return>', lambda event: self.commit_year())
+                cb.bind('<FocusOut>', lambda event: self.commit_year())
 
             c += 1
 
@@ -152,11 +249,45 @@ class DatePicker(tk.Toplevel):
         ttk.Separator(main_frame).pack(side='bottom', fill='x', expand=True)
         top_frame.pack(side='bottom', fill='x')
 
+    def commit_year(self):
+        """apply year typed in year combobox, limited to min_year and max_year"""
+        combo = self.combos['Year']
+        try:
+            year = self.clamp_year(int(combo.get()))
+        except ValueError:
+            year = self.fields['Year']['selection']
+
+        combo.set(year)
+        self.fields['Year']['selection'] = year
+        self.update_days()
+
+    def update_days(self):
+        """set correct days according to month and year"""
+        year = self.fields['Year']['selection']
+        month = self.fields['Month']['selection']
+        day = self.fields['Day']['selection']
+        days_in_month = self.days_in_month(year, month)
+        day_combo = self.combos['Day']
+        day_combo.config(values=list(range(1, days_in_month + 1)))
+        if day > days_in_month:
+            corrected_value = days_in_month
+            day_combo.set(corrected_value)
+            self.fields['Day']['selection'] = corrected_value
+
     def close(self):
-        self.destroy()
+        if self.reusable:
+            self.withdraw()
+            self.closed.set(True)
+        else:
+            self.destroy()
+
+        if self.callback:
+            self.callback(self.selected_date)
 
     def set_selection(self):
         """return selected date"""
+        # year typed without pressing enter
+        self.commit_year()
         values = [int(item['selection']) for item in self.fields.values()]
         self.selected_date = datetime.datetime(*values)
         self.close()
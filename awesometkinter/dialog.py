@@ -5,11 +5,22 @@
 
 """
 
+import os
 import platform
 import subprocess
 import shlex
+import shutil
+import threading
+import tkinter as tk
+from concurrent.futures import Future
+from functools import lru_cache
 from tkinter import filedialog
 
+if not __package__:
+    __package__ = 'awesometkinter'
+
+from .animation import get_clock
+
 
 operating_system = platform.system()  # current operating system  ('Windows', 'Linux', 'Darwin')
 
@@ -23,6 +34,21 @@ def run_command(cmd):
         return -1, ''
 
 
+@lru_cache(maxsize=None)
+def detect_backend():
+    """find available file chooser, detection runs only once
+
+    Returns:
+        (str): 'zenity', 'kdialog', or 'TK'
+    """
+    if operating_system == 'Linux':
+        for backend in ('zenity', 'kdialog'):
+            if shutil.which(backend):
+                return backend
+
+    return 'TK'
+
+
 class FileDialog:
     """use alternative file chooser to replace tkinter ugly file chooser on linux
 
@@ -34,39 +60,28 @@ class FileDialog:
     """
 
     def __init__(self, foldersonly=False):
-        self.use = 'TK'  # , 'zenity', or 'kdialog'
+        self.use = detect_backend()  # 'TK', 'zenity', or 'kdialog'
         self.foldersonly = foldersonly
         self.title = 'FireDM - '
         self.title += 'Select a folder' if self.foldersonly else 'Select a file'
-        if operating_system == 'Linux':
-            # looking for zenity
-            _, zenity_path = run_command('which zenity')
-            if zenity_path:
-                self.use = 'zenity'
-            else:
-                # looking for kdialog
-                _, kdialog_path = run_command('which kdialog')
-                if kdialog_path:
-                    self.use = 'kdialog'
 
-    def run(self, initialdir='', backend=None):
-        selected_path = initialdir
-        if backend:
-            self.use = backend
+    def build_command(self, initialdir=''):
+        """get external chooser command and its accepted return codes
 
+        Returns:
+            (2-tuple): command string, and tuple of return codes
+        """
         if self.use == 'zenity':
             cmd = 'zenity --file-selection'
             if self.foldersonly:
                 cmd += ' --directory'
             if isinstance(initialdir, str):
                 cmd += f' --filename="{initialdir}"'
-            retcode, path = run_command(cmd)
             # zenity will return either 0, 1 or 5, depending on whether the user pressed OK,
             # Cancel or timeout has been reached
-            if retcode in (0, 1, 5):
-                selected_path = path
+            return cmd, (0, 1, 5)
 
-        elif self.use == 'kdialog':
+        else:
             cmd = 'kdialog'
             if self.foldersonly:
                 cmd += ' --getexistingdirectory'
@@ -75,16 +90,93 @@ class FileDialog:
 
             if isinstance(initialdir, str):
                 cmd += f' "{initialdir}"'
+            # kdialog will return either 0, 1 depending on whether the user pressed OK, Cancel
+            return cmd, (0, 1)
+
+    def run(self, initialdir='', backend=None):
+        selected_path = initialdir
+        if backend:
+            self.use = backend
 
+        if self.use in ('zenity', 'kdialog'):
+            cmd, retcodes = self.build_command(initialdir)
             retcode, path = run_command(cmd)
-            # kdialog will return either 0, 1 depending on whether the user pressed OK, Cancel
-            if retcode in (0, 1):
+            if retcode in retcodes:
                 selected_path = path
         else:
             selected_path = self.run_default(initialdir=initialdir)
 
         return selected_path
 
+    def run_async(self, widget, callback=None, initialdir='', backend=None):
+        """show file chooser without blocking tkinter mainloop
+
+        external chooser process output is watched by tkinter file handler, or by a thread if file handlers are not
+        supported, tkinter file chooser is modal and will block until closed
+
+        Args:
+            widget: any tkinter widget, used to schedule callbacks on tkinter thread
+            callback (callable): a function to be called on tkinter thread with selected path
+            initialdir (str): initial folder
+            backend (str): 'zenity', 'kdialog', or 'TK'
+
+        Returns:
+            (concurrent.futures.Future): future of selected path, could be awaited in asyncio with
+                                         asyncio.wrap_future()
+        """
+        future = Future()
+        if backend:
+            self.use = backend
+
+        def finish(path):
+            future.set_result(path)
+            if callback:
+                callback(path)
+
+        if self.use not in ('zenity', 'kdialog'):
+            widget.after_idle(lambda: finish(self.run_default(initialdir=initialdir)))
+            return future
+
+        cmd, retcodes = self.build_command(initialdir)
+        try:
+            p = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except Exception:
+            widget.after_idle(finish, initialdir)
+            return future
+
+        def on_exit(output):
+            retcode = p.wait()
+            finish(output.decode('utf-8').strip() if retcode in retcodes else initialdir)
+
+        if hasattr(widget.tk, 'createfilehandler'):
+            chunks = []
+
+            def on_readable(*args):
+                data = os.read(p.stdout.fileno(), 65536)
+                if data:
+                    chunks.append(data)
+                else:
+                    widget.tk.deletefilehandler(p.stdout)
+                    p.stdout.close()
+                    on_exit(b''.join(chunks))
+
+            widget.tk.createfilehandler(p.stdout, tk.READABLE, on_readable)
+
+        else:
+            # read output in a thread, and check for result from tkinter thread
+            result = []
+            threading.Thread(target=lambda: result.append(p.communicate()[0]), daemon=True).start()
+            clock = get_clock(widget)
+
+            def check():
+                if result:
+                    clock.remove(poll_id)
+                    on_exit(result[0])
+
+            poll_id = clock.add(check, interval=100)
+
+        return future
+
     def run_default(self, initialdir=''):
         # use ugly tkinter filechooser
         if self.foldersonly:
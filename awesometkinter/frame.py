@@ -6,6 +6,7 @@
 """
 
 import tkinter as tk
+from contextlib import contextmanager
 from tkinter import ttk
 from .utils import *
 from .config import *
@@ -27,7 +28,7 @@ class ScrollableFrame(tk.Frame):
     """
 
     def __init__(self, parent, vscroll=True, hscroll=True, autoscroll=False, bg=None, sbar_fg=None, sbar_bg=None,
-                 vbar_width=10, hbar_width=10):
+                 vbar_width=10, hbar_width=10, smooth_scroll=False, kinetic_scroll=False, wheel_over_children=False):
         """initialize
 
         Args:
@@ -40,9 +41,21 @@ class ScrollableFrame(tk.Frame):
             sbar_bg (str): color of scrollbars' trough, default to frame's background
             vbar_width (int): vertical scrollbar width
             hbar_width (int): horizontal scrollbar width
+            smooth_scroll (bool): spread mousewheel scrolling over many frames instead of jumping
+            kinetic_scroll (bool): keep scrolling for a while after mousewheel or touchpad stops
+            wheel_over_children (bool): scroll with mousewheel over child widgets too, including children added later,
+                                        see scroll_with_mousewheel(apply_to_children=True)
         """
         self.autoscroll = autoscroll
+        self.smooth_scroll = smooth_scroll
+        self.kinetic_scroll = kinetic_scroll
         self.current_height = None
+        self.viewport_listeners = set()  # functions to be called when visible area changes, see add_viewport_listener()
+        self.visibility_trackers = {}  # {child widget: update function}, see track_visibility()
+        self.visibility_id = None  # pending visibility check of tracked children
+        self.watching_viewport = False  # scroll commands are wrapped to notify listeners
+        self.configure_id = None  # pending scroll region update
+        self.batch_depth = 0  # number of nested batch() blocks
 
         sbar_bg = sbar_bg or 'white'
         sbar_fg = sbar_fg or 'blue'
@@ -78,7 +91,12 @@ class ScrollableFrame(tk.Frame):
         self.canvas.bind("<Configure>", self._on_canvas_configure)
 
         # scroll with mousewheel
-        scroll_with_mousewheel(self, target=self.canvas)
+        scroll_with_mousewheel(self, target=self.canvas, apply_to_children=wheel_over_children)
+        if smooth_scroll or kinetic_scroll:
+            # scroll by pixels, default canvas unit is 1/10 of its size
+            self.canvas.config(yscrollincrement=1, xscrollincrement=1)
+            self.canvas.wheel_scroller = WheelScroller(self.canvas, smooth=smooth_scroll, kinetic=kinetic_scroll,
+                                                       steps=(40, 80))
 
         # use outer frame geometry managers
         self.pack = self.outer_frame.pack
@@ -103,8 +121,34 @@ class ScrollableFrame(tk.Frame):
         if self.winfo_width() > self.outer_frame.winfo_width():
             self.canvas.xview_scroll(*args)
 
+    @contextmanager
+    def batch(self):
+        """add or remove many child widgets with only one scroll region update and autoscroll at the end
+
+        Example:
+            with frame.batch():
+                for msg in messages:
+                    tk.Label(frame, text=msg).pack(anchor='w')
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                self._schedule_update()
+
+    def _schedule_update(self, event=None):
+        """update scroll region once when tkinter is idle, no matter how many configure events occurred"""
+        if self.configure_id is None and not self.batch_depth:
+            self.configure_id = self.after_idle(self._update_scrollregion)
+
     def _on_self_configure(self, event):
+        self._schedule_update()
+
+    def _update_scrollregion(self):
         """Reset the scroll region to match contents"""
+        self.configure_id = None
         if self.winfo_height() != self.current_height:
             self.canvas.configure(scrollregion=self.canvas.bbox("all"))
 
@@ -117,6 +161,56 @@ class ScrollableFrame(tk.Frame):
     def _on_canvas_configure(self, event):
         """expand self to fill canvas"""
         self.canvas.itemconfigure(self._id, width=self.canvas.winfo_width())
+        self.notify_viewport()
+
+    def _on_scroll(self, scrollbar, first, last):
+        if scrollbar:
+            scrollbar.set(first, last)
+        self.notify_viewport()
+
+    def add_viewport_listener(self, func):
+        """call func whenever visible area changes, e.g. scrolled or resized"""
+        self.viewport_listeners.add(func)
+        self.watch_viewport()
+
+    def remove_viewport_listener(self, func):
+        self.viewport_listeners.discard(func)
+        self.watch_viewport()
+
+    def watch_viewport(self):
+        """wrap canvas scroll commands while there are viewport listeners or tracked children
+
+        without listeners, canvas calls scrollbars directly
+        """
+        watching = bool(self.viewport_listeners or self.visibility_trackers)
+        if watching == self.watching_viewport:
+            return
+        self.watching_viewport = watching
+
+        # tcl commands are created once and reused
+        if not hasattr(self, 'scroll_commands'):
+            vsb = getattr(self, 'vsb', None)
+            hsb = getattr(self, 'hsb', None)
+            self.scroll_commands = {
+                False: (self.canvas.cget('yscrollcommand'), self.canvas.cget('xscrollcommand')),
+                True: (self.register(lambda *args: self._on_scroll(vsb, *args)),
+                       self.register(lambda *args: self._on_scroll(hsb, *args)))}
+
+        ycommand, xcommand = self.scroll_commands[watching]
+        self.canvas.configure(yscrollcommand=ycommand, xscrollcommand=xcommand)
+
+    def notify_viewport(self):
+        """call viewport listeners, and check visibility of tracked children once when tkinter is idle"""
+        for func in list(self.viewport_listeners):
+            func()
+
+        if self.visibility_trackers and self.visibility_id is None:
+            self.visibility_id = self.after_idle(self.check_visibility)
+
+    def check_visibility(self):
+        """check all tracked children against visible area in one pass"""
+        self.visibility_id = None
+        check_viewport(self)
 
     def vscroll(self, fraction):
         """scroll canvas vertically
@@ -143,6 +237,118 @@ class ScrollableFrame(tk.Frame):
         self.canvas.xview_moveto(fraction)
 
 
+class VirtualList(ScrollableFrame):
+    """ScrollableFrame that shows a big list of items using a small pool of recycled row widgets
+
+    only rows needed to fill visible area plus a buffer are created, when scrolled, rows are filled with new items,
+    and inner frame is moved along with visible area, scrollbar size depends on items count and row height
+
+    Example:
+        def create_row(parent):
+            return tk.Label(parent, anchor='w')
+
+        def update_row(row, index, item):
+            row.config(text=f'{index}: {item}')
+
+        vlist = VirtualList(root, data=list(range(100000)), create_row=create_row, update_row=update_row)
+        vlist.pack(fill='both', expand=True)
+    """
+
+    def __init__(self, parent, data=None, create_row=None, update_row=None, row_height=25, buffer=2, hscroll=False,
+                 **kwargs):
+        """initialize
+
+        Args:
+            parent (tk.Widget): tkinter master widget
+            data (sequence): items to be shown, any object that supports len() and indexing
+            create_row (callable): function that accept a parent widget and return a new row widget
+            update_row (callable): function that accept row widget, item index, and item, to fill row with item data
+            row_height (int): height of every row in pixels
+            buffer (int): number of extra rows before and after visible rows
+            hscroll (bool): use horizontal scrollbar
+            kwargs: ScrollableFrame parameters, mousewheel scrolls over rows by default, i.e. wheel_over_children=True
+        """
+        self.data = data if data is not None else []
+        self.create_row = create_row
+        self.update_row = update_row
+        self.row_height = row_height
+        self.buffer = buffer
+        self.rows = []  # row widgets pool
+        self.bound = []  # index of item shown in every row, None for hidden rows
+        self.first = 0  # index of item shown in first row
+
+        # rows fill visible area, so mousewheel must work over them
+        kwargs.setdefault('wheel_over_children', True)
+        ScrollableFrame.__init__(self, parent, hscroll=hscroll, **kwargs)
+
+        # scroll one row per mousewheel notch, unless smooth or kinetic scrolling uses pixels
+        if not (self.smooth_scroll or self.kinetic_scroll):
+            self.canvas.config(yscrollincrement=row_height)
+
+        # fill rows when visible area moves
+        self.add_viewport_listener(self.refresh)
+
+    def _update_scrollregion(self):
+        """scroll region depends on data size not on inner frame size"""
+        self.configure_id = None
+        self.update_scrollregion()
+
+    def _on_canvas_configure(self, event):
+        """expand self to fill canvas width, and set its height to fit rows pool"""
+        self.update_scrollregion()
+        ScrollableFrame._on_canvas_configure(self, event)
+
+    def update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(self.data) * self.row_height))
+
+    def set_data(self, data):
+        """replace items and redraw rows"""
+        self.data = data
+        self.update_scrollregion()
+        self.refresh(force=True)
+
+        if self.autoscroll:
+            self.scrolltobottom()
+
+    def refresh(self, force=False):
+        """fill rows with items in visible area
+
+        Args:
+            force (bool): update all rows even if their item index didn't change, e.g. after data items changed
+        """
+        count = len(self.data)
+        top = int(self.canvas.canvasy(0)) // self.row_height
+        first = max(0, top - self.buffer)
+        needed = self.canvas.winfo_height() // self.row_height + 1 + self.buffer * 2
+
+        # create missing rows
+        while len(self.rows) < needed:
+            row = self.create_row(self)
+            self.rows.append(row)
+            self.bound.append(None)
+            force = True
+
+        if force:
+            self.canvas.itemconfigure(self._id, height=len(self.rows) * self.row_height)
+
+        # move inner frame with visible area
+        if first != self.first:
+            self.first = first
+            self.canvas.coords(self._id, 0, first * self.row_height)
+
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if index < count:
+                if force or self.bound[i] != index:
+                    if self.bound[i] is None:
+                        row.place(x=0, y=i * self.row_height, relwidth=1, height=self.row_height)
+                    self.update_row(row, index, self.data[index])
+                    self.bound[i] = index
+            elif self.bound[i] is not None:
+                row.place_forget()
+                self.bound[i] = None
+
+
 class Frame3d(ttk.Frame):
     """create a frame with 3d background color and shadow"""
     styles = []
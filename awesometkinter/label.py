@@ -8,6 +8,11 @@
 import tkinter as tk
 from tkinter import font as tkfont
 
+if not __package__:
+    __package__ = 'awesometkinter'
+
+from .animation import get_clock
+
 
 class AutoWrappingLabel(tk.Label):
     """auto-wrapping label
@@ -29,15 +34,16 @@ class AutofitLabel(tk.Label):
         tk.Label.__init__(self, parent, justify=justify, anchor=anchor, **kwargs)
         self.original_text = ''
         self.id = None
+        self.clock = get_clock(self)
         self.bind('<Configure>', self.schedule)
 
     def schedule(self, *args):
         self.unschedule()
-        self.id = self.after(self.refresh_time, self.update_text)
+        self.id = self.clock.schedule(self.refresh_time, self.update_text)
 
     def unschedule(self):
         if self.id:
-            self.after_cancel(self.id)
+            self.clock.cancel(self.id)
             self.id = None
 
     def update_text(self, *args):
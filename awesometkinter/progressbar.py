@@ -5,33 +5,48 @@
 
 """
 
+import itertools
 import tkinter as tk
+from array import array
+from bisect import bisect_left, bisect_right
 from tkinter import ttk
+from PIL import Image
 
 if not __package__:
     __package__ = 'awesometkinter'
 
 from .utils import *
 from .images import *
+from .telemetry import format_bytes
+from .animation import FlushQueue, get_clock
 
 
 class RadialProgressbar(tk.Frame):
     """create radial flat progressbar
 
-    basically this is a ttk horizontal progressbar modified using custom style layout and images
+    basically this is a ttk horizontal progressbar modified using custom style layout and images, in arc mode it is
+    a label that swaps between cached arc images
 
     Example:
         bar = RadialProgressbar(frame1, size=150, fg='green')
         bar.grid(padx=10, pady=10)
         bar.start()
+
+        # progress drawn as a clockwise arc
+        arc_bar = RadialProgressbar(frame1, size=150, fg='green', arc=True)
+
+        # from a worker thread
+        bar.set_threadsafe(55)
     """
 
     # class variables to be shared between objects
     styles = []  # hold all style names created for all objects
     imgs = {}  # imgs{"size":{"color": img}}  example: imgs{"100":{"red": img}}
+    arcs = {}  # {(size, fg, bg, thickness): [img for every value 0 to 100]}, used in arc mode
+    spinners = {}  # {(size, fg, bg, thickness): [img for every spinner step]}, used in arc mode
 
     def __init__(self, parent, size=100, bg=None, fg='cyan', text_fg=None, text_bg=None, font=None, font_size_ratio=0.1,
-                 base_img=None, indicator_img=None, parent_bg=None, **extra):
+                 base_img=None, indicator_img=None, parent_bg=None, fps=30, arc=False, thickness=None, **extra):
         """initialize progressbar
 
         Args:
@@ -46,6 +61,10 @@ class RadialProgressbar(tk.Frame):
             base_img (tk.PhotoImage): base image for progressbar
             indicator_img (tk.PhotoImage): indicator image for progressbar
             parent_bg (str): color of parent container
+            fps (int): max. number of times per second to apply values posted by set_threadsafe()
+            arc (bool): draw progress as a clockwise arc instead of a left to right wipe, base_img and
+                        indicator_img are not used in this mode
+            thickness (int): ring thickness in pixels for arc mode, default is 2% of size
             extra: any extra kwargs
 
         """
@@ -56,29 +75,65 @@ class RadialProgressbar(tk.Frame):
         self.fg = fg
         self.text_fg = text_fg or calc_font_color(self.parent_bg)
         self.text_bg = text_bg or self.parent_bg
-        self.size = size if isinstance(size, (list, tuple)) else (size, size)
+        # tuple, since size is a key of class-level image caches
+        self.size = tuple(size) if isinstance(size, (list, tuple)) else (size, size)
         self.font_size_ratio = font_size_ratio
         self.font = font or f'any {int((sum(self.size) // 2) * self.font_size_ratio)}'
 
         self.base_img = base_img
         self.indicator_img = indicator_img
+        self.arc = arc
+        self.thickness = thickness
+        self.shown_frame = None  # arc frame displayed in arc mode
+        self.spinner_id = None
 
         self.var = tk.IntVar()
+        self.shown_text = None  # text displayed in percentage label
+
+        # thread-safe updates, only latest posted value will be applied once per frame
+        self.frame_time = max(1000 // fps, 1)  # milliseconds
+        self.posted_updates = 0  # number of set_threadsafe() calls, counted when applied
+        self.applied_updates = 0  # number of posted values applied to progressbar
+        self.coalesced_updates = 0  # posted values dropped because a newer value came before next frame
+
+        # transfer speed and ETA, see attach_telemetry()
+        self.telemetry = None
+        self.show_speed = False
+        self.telemetry_value = False
+        self.telemetry_id = None  # clock key of refresh_telemetry()
+
+        # progress posted by worker processes, see attach_channel()
+        self.channel = None
+        self.channel_slot = None
+        self.channel_seq = None
+        self.channel_id = None  # clock key of poll_channel()
+
+        # latest value set while progressbar is invisible, see on_visibility()
+        self.hidden_value = None
 
         # initialize super class
         tk.Frame.__init__(self, master=parent)
+        track_visibility(self, self.on_visibility)
+
+        if self.arc:
+            # a single label shows both arc image and percentage
+            self.arc_frames = self.create_arc_frames()
+            self.bar = tk.Label(self, image=self.arc_frames[0], text='0%', compound='center', bd=0)
+            self.bar.pack()
+            self.percent_label = self.bar
+            self.var.trace_add('write', self.show_arc)
+        else:
+            # create custom progressbar style
+            self.bar_style = self.create_style()
 
-        # create custom progressbar style
-        self.bar_style = self.create_style()
-
-        # create tk Progressbar
-        self.bar = ttk.Progressbar(self, orient='horizontal', mode='determinate', length=self.size[0],
-                                   variable=self.var, style=self.bar_style)
-        self.bar.pack()
+            # create tk Progressbar
+            self.bar = ttk.Progressbar(self, orient='horizontal', mode='determinate', length=self.size[0],
+                                       variable=self.var, style=self.bar_style)
+            self.bar.pack()
 
-        # percentage Label
-        self.percent_label = ttk.Label(self.bar, text='0%')
-        self.percent_label.place(relx=0.5, rely=0.5, anchor="center")
+            # percentage Label
+            self.percent_label = ttk.Label(self.bar, text='0%')
+            self.percent_label.place(relx=0.5, rely=0.5, anchor="center")
 
         # trace progressbar value to show in label
         self.var.trace_add('write', self.show_percentage)
@@ -86,17 +141,177 @@ class RadialProgressbar(tk.Frame):
         # set default attributes
         self.config(**extra)
 
-        self.start = self.bar.start
-        self.stop = self.bar.stop
+        self.clock = get_clock(self)
+        self.pending_values = FlushQueue(self, self.apply_pending_values, delay=self.frame_time)
+        self.bind('<Destroy>', self.on_destroy, add='+')
 
     def set(self, value):
-        """set and validate progressbar value"""
+        """set and validate progressbar value, while progressbar is invisible only latest value will be stored"""
         value = self.validate_value(value)
-        self.var.set(value)
+        if not self.visible:
+            self.hidden_value = value
+        elif value != self.var.get():
+            self.var.set(value)
+
+    def on_visibility(self, visible):
+        """apply latest value stored while progressbar was invisible"""
+        if visible:
+            if self.hidden_value is not None:
+                value, self.hidden_value = self.hidden_value, None
+                self.set(value)
+            self.show_percentage()
+
+    def set_threadsafe(self, value):
+        """set progressbar value, safe to be called from any thread
+
+        value is not applied immediately, only latest value will be applied on tkinter thread in next frame
+        """
+        self.pending_values.put(value)
+
+    def apply_pending_values(self, values):
+        """apply latest value posted by set_threadsafe(), runs on tkinter thread"""
+        self.posted_updates += len(values)
+        self.coalesced_updates += len(values) - 1
+        self.applied_updates += 1
+        self.set(values[-1])
+
+    def attach_telemetry(self, telemetry, show_speed=True, set_value=False, refresh_time=500):
+        """show transfer speed and ETA from a TransferTelemetry object
+
+        telemetry summary will be shown in a tooltip if exist, e.g. atk.tooltip(bar, '')
+
+        Args:
+            telemetry (TransferTelemetry): telemetry object, could be shared with other widgets, None to detach
+            show_speed (bool): show speed under percentage text
+            set_value (bool): set progressbar value from telemetry percent, ignored if telemetry total is unknown
+            refresh_time (int): milliseconds between refreshes
+        """
+        self.telemetry = telemetry
+        self.show_speed = show_speed
+        self.telemetry_value = set_value
+        self.clock.remove(self.telemetry_id)
+        self.telemetry_id = self.clock.add(self.refresh_telemetry, interval=refresh_time) if telemetry else None
+        self.show_percentage()
+
+    def attach_channel(self, channel, slot):
+        """show progress written by a worker process into a ProgressChannel slot, channel is polled once per frame
+
+        Args:
+            channel (ProgressChannel): progress channel, None to detach
+            slot (int): slot index
+        """
+        self.channel = channel
+        self.channel_slot = slot
+        self.channel_seq = None
+        self.clock.remove(self.channel_id)
+        self.channel_id = self.clock.add(self.poll_channel, interval=self.frame_time) if channel else None
+
+    def poll_channel(self):
+        """apply channel slot counters if changed"""
+        snapshot = self.channel.read(self.channel_slot, since=self.channel_seq, bitmap=False)
+        if snapshot:
+            self.channel_seq, _, total, done, _ = snapshot
+            self.set(done * 100 // total if total else 0)
+
+            if self.telemetry:
+                self.telemetry.update(done)
+
+    def refresh_telemetry(self):
+        """update progressbar from attached telemetry, runs every refresh time"""
+        if not self.visible:
+            return
+
+        if self.telemetry_value and self.telemetry.total:
+            self.set(self.telemetry.percent)
+
+        self.show_percentage()
+
+        if hasattr(self, 'update_tooltip'):
+            self.update_tooltip(self.telemetry.summary())
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.clock.remove(self.telemetry_id)
+            self.clock.remove(self.channel_id)
+            self.clock.remove(self.spinner_id)
+
+    def arc_key(self):
+        return self.size, self.fg, self.bg, self.thickness
+
+    def arc_image(self, base, indicator, start, end):
+        """cut an arc from indicator ring and draw it over base ring"""
+        return ImageTk.PhotoImage(Image.composite(indicator, base, create_arc_mask(self.size, start, end)))
+
+    def create_rings(self):
+        base = create_circle(self.size, thickness=self.thickness, color=self.bg)
+        indicator = create_circle(self.size, thickness=self.thickness, color=self.fg)
+        return base, indicator
+
+    def create_arc_frames(self):
+        """get an image for every value from 0 to 100, images are created once and shared between objects"""
+        key = self.arc_key()
+        if key not in RadialProgressbar.arcs:
+            base, indicator = self.create_rings()
+            RadialProgressbar.arcs[key] = [self.arc_image(base, indicator, 0, 360 * value / 100)
+                                           for value in range(101)]
+
+        return RadialProgressbar.arcs[key]
+
+    def create_spinner_frames(self, steps=36, length=90):
+        """get images of a rotating arc, used as indeterminate mode in arc mode
+
+        Args:
+            steps (int): number of images in a full rotation
+            length (int): arc length in degrees
+        """
+        key = self.arc_key()
+        if key not in RadialProgressbar.spinners:
+            base, indicator = self.create_rings()
+            RadialProgressbar.spinners[key] = [self.arc_image(base, indicator, angle, angle + length)
+                                               for angle in range(0, 360, 360 // steps)]
+
+        return RadialProgressbar.spinners[key]
+
+    def show_arc(self, *args):
+        """display arc image of current value in arc mode"""
+        value = self.get()
+        if value != self.shown_frame and not self.spinner_id:
+            self.shown_frame = value
+            self.bar.config(image=self.arc_frames[value])
+
+    def start(self, interval=50):
+        """start indeterminate animation until stop() get called, the same as ttk progressbar start()
+
+        progressbar value will be increased every step, in arc mode a rotating arc will be shown instead
+
+        Args:
+            interval (int): milliseconds between animation steps
+        """
+        if self.spinner_id:
+            return
+
+        if self.arc:
+            frames = itertools.cycle(self.create_spinner_frames())
+            step = lambda: self.visible and self.bar.config(image=next(frames))
+            step()
+        else:
+            step = lambda: self.visible and self.bar.step()
+
+        self.spinner_id = self.clock.add(step, interval=interval)
+
+    def stop(self):
+        """stop indeterminate animation"""
+        if self.spinner_id:
+            self.clock.remove(self.spinner_id)
+            self.spinner_id = None
+
+        if self.arc:
+            self.shown_frame = None
+            self.show_arc()
 
     def get(self):
         """get validated progressbar value"""
-        value = self.var.get()
+        value = self.var.get() if self.hidden_value is None else self.hidden_value
         return self.validate_value(value)
 
     def validate_value(self, value):
@@ -170,8 +385,13 @@ class RadialProgressbar(tk.Frame):
 
     def show_percentage(self, *args):
         """display progressbar percentage in a label"""
-        bar_value = self.get()
-        self.percent_label.config(text=f'{bar_value}%')
+        text = f'{self.get()}%'
+        if self.telemetry and self.show_speed:
+            text += f'\n{format_bytes(self.telemetry.speed)}/s'
+
+        if text != self.shown_text:
+            self.shown_text = text
+            self.percent_label.config(text=text)
 
     def config(self, **kwargs):
         """config widgets' parameters"""
@@ -186,7 +406,8 @@ class RadialProgressbar(tk.Frame):
         self['bg'] = self.parent_bg
 
         # bar style configure
-        s.configure(self.bar_style, background=self.parent_bg, troughcolor=self.parent_bg)
+        if not self.arc:
+            s.configure(self.bar_style, background=self.parent_bg, troughcolor=self.parent_bg)
 
         # percentage label
         self.percent_label.config(background=self.text_bg, foreground=self.text_fg, font=self.font)
@@ -250,66 +471,1184 @@ class RadialProgressbar3d(RadialProgressbar):
         RadialProgressbar.__init__(self, **kwargs)
 
 
+class ProgressGrid(tk.Canvas):
+    """many radial progress indicators drawn on a single canvas
+
+    every indicator is one canvas image and one canvas text, ring images are shared with RadialProgressbar, and
+    every percentage frame is built once per (size, fg, bg) and reused by all indicators, only indicators whose
+    value changed get redrawn
+
+    Example:
+        grid = ProgressGrid(root, size=60, columns=10)
+        grid.pack()
+
+        for job in jobs:
+            grid.add(job.id)
+
+        grid.set('job1', 40)
+        grid.set_many({'job2': 10, 'job3': 75})
+    """
+
+    # class variable to be shared between objects
+    frames = {}  # {(size, fg, bg): {value: img}}, percentage frames for every ring
+
+    def __init__(self, master, size=60, columns=10, bg=None, fg='cyan', text_fg=None, font=None,
+                 font_size_ratio=0.15, parent_bg=None, gap=10, width=None, height=None):
+        """initialize
+
+        Args:
+            master: tkinter container
+            size (int or 2-tuple(int, int)): size of every indicator in pixels
+            columns (int): number of indicators in every row
+            bg (str): color of base ring
+            fg (str): default color of indicator ring
+            text_fg (str): percentage text color
+            font (str): tkinter font for percentage text, e.g. 'any 10'
+            font_size_ratio (float): font size to indicator width ratio
+            parent_bg (str): canvas background
+            gap (int): space between indicators in pixels
+            width (int): canvas width, default is width of all columns
+            height (int): canvas height, default is height of one row
+        """
+        self.master = master
+        self.parent_bg = parent_bg or get_widget_attribute(master, 'background')
+        self.bg = bg or calc_contrast_color(self.parent_bg, 30)
+        self.fg = fg
+        self.text_fg = text_fg or calc_font_color(self.parent_bg)
+        self.size = tuple(size) if isinstance(size, (list, tuple)) else (size, size)  # key of shared image caches
+        self.font = font or f'any {int((sum(self.size) // 2) * font_size_ratio)}'
+        self.columns = columns
+        self.gap = gap
+
+        self.keys = []  # indicators keys in display order
+        self.values = {}  # {key: value}
+        self.colors = {}  # {key: fg}
+        self.items = {}  # {key: (image id, text id)}
+        self.changed = set()  # keys waiting for redraw
+        self.render_id = None
+
+        width = width or columns * (self.size[0] + gap) + gap
+        height = height or self.size[1] + gap * 2
+        super().__init__(master, bg=self.parent_bg, width=width, height=height, bd=0, highlightthickness=0)
+        scroll_with_mousewheel(self)
+
+        # changed indicators will be redrawn when grid become visible
+        track_visibility(self, lambda visible: visible and self.schedule_render())
+
+    def ring(self, color):
+        """get ring image from RadialProgressbar images cache"""
+        imgs = RadialProgressbar.imgs.setdefault(self.size, {})
+        img = imgs.get(color)
+        if not img:
+            img = ImageTk.PhotoImage(create_circle(self.size, color=color))
+            imgs[color] = img
+        return img
+
+    def frame(self, value, fg):
+        """get cached image of base ring partially covered by indicator ring, the same as RadialProgressbar look"""
+        frames = ProgressGrid.frames.setdefault((self.size, fg, self.bg), {})
+        img = frames.get(value)
+        if not img:
+            width, height = self.size
+            img = tk.PhotoImage(master=self, width=width, height=height)
+            img.tk.call(img, 'copy', self.ring(self.bg))
+            x = width * value // 100
+            if x:
+                img.tk.call(img, 'copy', self.ring(fg), '-from', 0, 0, x, height, '-to', 0, 0)
+            frames[value] = img
+        return img
+
+    def cell(self, index):
+        """get center point of indicator at index"""
+        row, column = divmod(index, self.columns)
+        width, height = self.size
+        x = self.gap + column * (width + self.gap) + width // 2
+        y = self.gap + row * (height + self.gap) + height // 2
+        return x, y
+
+    def update_scrollregion(self):
+        rows = -(-len(self.keys) // self.columns)
+        width, height = self.size
+        self.config(scrollregion=(0, 0, self.gap + self.columns * (width + self.gap),
+                                  self.gap + rows * (height + self.gap)))
+
+    def add(self, key, value=0, fg=None):
+        """add a new indicator
+
+        Args:
+            key: any hashable unique identifier
+            value (int): 0 to 100
+            fg (str): indicator ring color, default is grid fg
+        """
+        if key in self.items:
+            return
+
+        x, y = self.cell(len(self.keys))
+        img_id = self.create_image(x, y, anchor='center')
+        text_id = self.create_text(x, y, anchor='center', fill=self.text_fg, font=self.font)
+
+        self.keys.append(key)
+        self.items[key] = (img_id, text_id)
+        self.colors[key] = fg or self.fg
+        self.values[key] = None
+        self.set(key, value)
+        self.update_scrollregion()
+
+    def remove(self, key):
+        """remove indicator and move next indicators to fill its place"""
+        if key not in self.items:
+            return
+
+        index = self.keys.index(key)
+        self.delete(*self.items.pop(key))
+        self.keys.remove(key)
+        self.values.pop(key)
+        self.colors.pop(key)
+        self.changed.discard(key)
+
+        for i, k in enumerate(self.keys[index:], start=index):
+            x, y = self.cell(i)
+            for item in self.items[k]:
+                self.coords(item, x, y)
+
+        self.update_scrollregion()
+
+    def get(self, key):
+        """get value of indicator"""
+        return self.values[key]
+
+    def set(self, key, value):
+        """set value of indicator, redraw will occur later when tkinter is idle"""
+        try:
+            value = min(max(int(value), 0), 100)
+        except (TypeError, ValueError):
+            value = 0
+
+        if value != self.values[key]:
+            self.values[key] = value
+            self.changed.add(key)
+            self.schedule_render()
+
+    def set_many(self, values):
+        """set values of many indicators at once
+
+        Args:
+            values (dict or iterable): {key: value} or [(key, value), ...]
+        """
+        items = values.items() if isinstance(values, dict) else values
+        for key, value in items:
+            self.set(key, value)
+
+    def schedule_render(self):
+        if self.render_id is None and self.visible:
+            self.render_id = self.after_idle(self.render)
+
+    def render(self):
+        """redraw changed indicators only"""
+        self.render_id = None
+        for key in self.changed:
+            img_id, text_id = self.items[key]
+            value = self.values[key]
+            self.itemconfig(img_id, image=self.frame(value, self.colors[key]))
+            self.itemconfig(text_id, text=f'{value}%')
+        self.changed.clear()
+
+
+class IntervalSet:
+    """sorted set of merged half-open integer ranges [start, end)
+
+    ranges are stored in two compact arrays of 64-bit integers, overlapping or adjacent ranges get merged when added,
+    and lookups use binary search
+
+    Example:
+        ranges = IntervalSet()
+        ranges.add(0, 10)
+        ranges.add(10, 20)  # merged with first range
+        list(ranges)  # [(0, 20)]
+        ranges.find(5)  # (0, 20)
+    """
+
+    def __init__(self, ranges=None):
+        """initialize
+
+        Args:
+            ranges (iterable): optional (start, end) ranges
+        """
+        self.starts = array('q')
+        self.ends = array('q')
+        self.covered = 0  # total length of all ranges
+
+        for start, end in ranges or []:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __repr__(self):
+        return f'IntervalSet({list(self)})'
+
+    def add(self, start, end):
+        """add range and merge it with overlapping or adjacent ranges
+
+        Returns:
+            (2-tuple): merged range that contains the added range, or None for an empty range
+        """
+        if end <= start:
+            return None
+
+        # ranges from i to j-1 overlap or touch the new range
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+
+        if i < j:
+            self.covered -= sum(self.ends[i:j]) - sum(self.starts[i:j])
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+
+        self.starts[i:j] = array('q', [start])
+        self.ends[i:j] = array('q', [end])
+        self.covered += end - start
+
+        return start, end
+
+    def find(self, pos):
+        """get the range that contains a position
+
+        Returns:
+            (2-tuple): (start, end) or None
+        """
+        i = bisect_right(self.starts, pos) - 1
+        if i >= 0 and pos < self.ends[i]:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def covers(self, start, end):
+        """check if range [start, end) is completely covered by a single range"""
+        rng = self.find(start)
+        return rng is not None and end <= rng[1]
+
+    def overlapping(self, start, end):
+        """get ranges that overlap or touch range [start, end)
+
+        Returns:
+            (list): list of (start, end) tuples
+        """
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+        return list(zip(self.starts[i:j], self.ends[i:j]))
+
+    def gaps(self, start, end):
+        """get parts of range [start, end) which are not covered
+
+        Returns:
+            (list): list of (start, end) tuples
+        """
+        result = []
+        for s, e in self.overlapping(start, end):
+            if s > start:
+                result.append((start, s))
+            start = max(start, e)
+
+        if start < end:
+            result.append((start, end))
+
+        return result
+
+    def clear(self):
+        del self.starts[:]
+        del self.ends[:]
+        self.covered = 0
+
+
+def scale_range(start, end, total, width):
+    """map a range e.g. of bytes to pixel columns
+
+    exact integer math is used to avoid float precision loss with large totals, start is rounded down and end is
+    rounded up, so a partially covered pixel will be included
+
+    Args:
+        start (int): range start
+        end (int): range end, not included
+        total (int): total size, e.g. file size
+        width (int): total width in pixels
+
+    Returns:
+        (2-tuple): (x0, x1) pixel columns, x1 not included
+    """
+    return start * width // total, -(-end * width // total)
+
+
 class Segmentbar(tk.Canvas):
-    def __init__(self, master, bg=None, fg=None, width=100, height=10):
+    """segment progressbar, show downloaded parts of a file
+
+    downloaded ranges are stored in an IntervalSet, and each group of adjacent filled pixel columns drawn as one
+    canvas rectangle
+
+    Example:
+        sb = Segmentbar(root, width=200)
+        sb.pack(fill='x')
+
+        # segments_progress, e.g [total size, [(starting range, length), ...]]
+        sb.ubdate_bars([400, [(20, 10), (100, 55)]])
+
+        # or report changes only, safe to be called from any thread
+        sb.reset(400)
+        sb.add_range(20, 10)
+        sb.extend(20, 5)  # range that starts at 20 is now (20, 35)
+    """
+
+    def __init__(self, master, bg=None, fg=None, width=100, height=10, fps=30):
         self.master = master
         master_bg = get_widget_attribute(master, 'background')
         bg = bg or calc_contrast_color(master_bg, 30)
         self.fg = fg or calc_font_color(bg)
-        self.bars = {}
+        self.bars = {}  # {start pixel: canvas rectangle id}
         self.height = height
         self.width = width
+        self.total = 0
+        self.segments = IntervalSet()  # downloaded ranges
+        self.pixels = IntervalSet()  # filled pixel columns
+        self.hover_range = None  # downloaded range under mouse pointer
+        self.streams = {}  # {range start: range end} for ranges reported by add_range() and extend()
+        self.frame_time = max(1000 // fps, 1)  # milliseconds
+        self.telemetry = None  # see attach_telemetry()
+        self.telemetry_id = None  # clock key of show_tooltip()
+        self.channel = None  # see attach_channel()
+        self.channel_slot = None
+        self.channel_seq = None
+        self.channel_generation = None
+        self.channel_id = None  # clock key of poll_channel()
+        self.stale = False  # segments changed while bar is invisible
         super().__init__(self.master, bg=bg, width=self.width, height=self.height, bd=0, highlightthickness=0)
+        track_visibility(self, self.on_visibility)
         self.bind('<Configure>', self.redraw)
+        self.bind('<Motion>', self.on_motion, add='+')
+        self.bind('<Destroy>', self.on_destroy, add='+')
+        self.clock = get_clock(self)
+        self.events = FlushQueue(self, self.flush_events, delay=self.frame_time)  # add_range(), extend(), and reset()
 
     def ubdate_bars(self, segments_progress):
-        # segments_progress, e.g [total size, [(starting range, length), ...]]
-        size = segments_progress[0]
+        """update bar with a snapshot of segments progress
+
+        Args:
+            segments_progress: list of total size and list of segments, e.g [total size, [(start, length), ...]]
+        """
+        size, segments = segments_progress
+
+        if size != self.total:
+            self.clear(size)
+
+        changed = False
+        for start, length in segments:
+            changed = self.fill(start, start + length) or changed
+
+        # one redraw for all changes
+        if changed:
+            self.update_idletasks()
+
+    def add_range(self, start, length):
+        """mark a range as downloaded, safe to be called from any thread
+
+        Args:
+            start (int): range start, e.g. byte offset
+            length (int): range length
+        """
+        self.events.put(('add', start, length))
+
+    def extend(self, start, delta):
+        """extend a range that was added by add_range(), safe to be called from any thread
+
+        Args:
+            start (int): start of range
+            delta (int): number of bytes added to the end of range
+        """
+        self.events.put(('extend', start, delta))
+
+    def reset(self, total=None):
+        """clear all ranges, safe to be called from any thread
+
+        Args:
+            total (int): new total size, if omitted current total will be used
+        """
+        self.events.put(('reset', total, None))
+
+    def flush_events(self, events):
+        """apply queued events, runs on tkinter thread at most once per frame"""
+        for kind, start, value in events:
+
+            if kind == 'add':
+                end = start + value
+                self.streams[start] = max(self.streams.get(start, start), end)
+                self.fill(start, end)
+
+            elif kind == 'extend':
+                end = self.streams.get(start, start)
+                self.streams[start] = end + value
+                self.fill(end, end + value)
+
+            elif kind == 'reset':
+                self.clear(self.total if start is None else start)
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.clock.remove(self.telemetry_id)
+            self.clock.remove(self.channel_id)
+
+    def attach_telemetry(self, telemetry, refresh_time=500, reset=False):
+        """feed newly downloaded bytes to a TransferTelemetry object
+
+        telemetry summary will be shown in a tooltip if exist, e.g. atk.tooltip(segmentbar, '')
 
-        # scale values
-        scale = size / self.width
-        scaled_values = set()  # use set to filter repeated values
-        for item in segments_progress[1]:
-            start, length = item
-            start = start // scale  # ignore fraction, e.g. 3.7 ====> 3.0
-            length = length // scale + (1 if length % scale else 0)  # ceiling, eg: 3.2 ====> 4.0
-            end = start + length
+        ranges already downloaded are used as a starting point, they are not counted as transfer speed
+
+        Args:
+            telemetry (TransferTelemetry): telemetry object, could be shared with other widgets, None to detach
+            refresh_time (int): milliseconds between tooltip refreshes
+            reset (bool): clear telemetry and set its total size to segmentbar total
+        """
+        self.telemetry = telemetry
+        self.clock.remove(self.telemetry_id)
+        self.telemetry_id = self.clock.add(self.show_tooltip, interval=refresh_time) if telemetry else None
+        if telemetry:
+            if reset:
+                telemetry.reset(self.total or None)
+            telemetry.seed(self.segments.covered)
+
+    def attach_channel(self, channel, slot):
+        """show ranges written by a worker process into a ProgressChannel slot, channel is polled once per frame
+
+        Args:
+            channel (ProgressChannel): progress channel, None to detach
+            slot (int): slot index
+        """
+        self.channel = channel
+        self.channel_slot = slot
+        self.channel_seq = None
+        self.channel_generation = None
+        self.clock.remove(self.channel_id)
+        self.channel_id = self.clock.add(self.poll_channel, interval=self.frame_time) if channel else None
+
+    def poll_channel(self):
+        """apply channel slot ranges if changed"""
+        snapshot = self.channel.read(self.channel_slot, since=self.channel_seq)
+        if not snapshot:
+            return
+
+        self.channel_seq, generation, total, _, data = snapshot
+        if generation != self.channel_generation or total != self.total:
+            self.channel_generation = generation
+            self.clear(total)
+
+        for start, end in self.channel.bitmap_ranges(data, total):
+            self.fill(start, end)
+
+    def report_progress(self, size):
+        """add newly downloaded bytes to attached telemetry"""
+        if self.telemetry and size:
+            self.telemetry.add(size)
+
+    def fill(self, start, end):
+        """mark range [start, end) as downloaded and draw pixel columns it touches
+
+        Returns:
+            (bool): True if canvas changed
+        """
+        if end <= start or self.segments.covers(start, end):
+            return False
 
-            start = int(start)
-            end = int(end)
+        covered = self.segments.covered
+        self.segments.add(start, end)
+        self.report_progress(self.segments.covered - covered)
 
-            scaled_values.add((start, end))
+        if self.total:
+            if self.visible:
+                return self.update_bar(scale_range(start, end, self.total, self.width))
+            self.stale = True
 
-        for item in scaled_values:
-            self.update_bar(item)
+        return False
+
+    def clear(self, total=0):
+        """remove all ranges and set a new total size"""
+        self.total = total
+        self.segments.clear()
+        self.streams.clear()
+        self.clear_bars()
+
+        if self.telemetry:
+            self.telemetry.reset(total or None)
 
     def update_bar(self, info):
-        """expecting a tuple or a list with the following structure
-        (range-start, length, total-file-size)"""
+        """fill pixel columns, merging with adjacent filled columns
+
+        Args:
+            info (2-tuple): (start pixel, end pixel)
+
+        Returns:
+            (bool): True if canvas changed
+        """
         start, end = info
+        if end <= start or self.pixels.covers(start, end):
+            return False
+
+        merged = self.pixels.overlapping(start, end)
+        start, end = self.pixels.add(start, end)
+
+        # reuse one rectangle for merged range and delete the rest
+        tag_id = None
+        for s, _ in merged:
+            item = self.bars.pop(s)
+            if tag_id is None:
+                tag_id = item
+            else:
+                self.delete(item)
 
-        tag_id = self.bars.get(start, None)
         if tag_id:
-            x0, y0, x1, y1 = self.coords(tag_id)
-            x1 = end
-            self.coords(tag_id, x0, y0, x1, y1)
+            self.coords(tag_id, start, 0, end, self.height)
         else:
             tag_id = self.create_rectangle(start, 0, end, self.height, fill=self.fg, width=0)
-            self.bars[start] = tag_id
 
-        self.update_idletasks()
+        self.bars[start] = tag_id
+        return True
+
+    def clear_bars(self):
+        """remove all drawn rectangles"""
+        if self.bars:
+            self.delete(*self.bars.values())
+        self.bars.clear()
+        self.pixels.clear()
 
     def redraw(self, *args):
-        # in case of window get resized by user
-        scale = self.winfo_width() / self.width
-        self.width = self.winfo_width()
-        for tag_id in self.bars.values():
-            x0, y0, x1, y1 = self.coords(tag_id)
-            x0 *= scale
-            x1 *= scale
-            self.coords(tag_id, x0, y0, x1, y1)
-
-        self.update_idletasks()
+        # in case of window get resized by user, rescale from stored segments
+        width = max(self.winfo_width(), 1)
+        height = max(self.winfo_height(), 1)
+        if (width, height) == (self.width, self.height):
+            return
+
+        self.width = width
+        self.height = height
+        self.rebuild()
+
+    def rebuild(self):
+        """redraw all bars from stored segments"""
+        self.stale = False
+        self.clear_bars()
+
+        if self.total:
+            for start, end in self.segments:
+                self.update_bar(scale_range(start, end, self.total, self.width))
+
+    def on_visibility(self, visible):
+        """draw segments added while bar was invisible"""
+        if visible and self.stale:
+            self.rebuild()
+
+    def range_at(self, x):
+        """get downloaded range at pixel column x
+
+        Returns:
+            (2-tuple): (start, end) or None
+        """
+        if not self.total:
+            return None
+
+        # map pixel column back to a range of bytes
+        start, end = scale_range(x, x + 1, self.width, self.total)
+        for s, e in self.segments.overlapping(start, end):
+            if s < end and e > start:
+                return s, e
+
+        return None
+
+    def on_motion(self, event):
+        self.hover_range = self.range_at(event.x)
+        self.show_tooltip()
+
+    def show_tooltip(self):
+        # update tooltip if exist, e.g. atk.tooltip(segmentbar, '')
+        if hasattr(self, 'update_tooltip'):
+            lines = [f'{self.hover_range[0]:,} - {self.hover_range[1]:,}'] if self.hover_range else []
+            if self.telemetry:
+                lines.append(self.telemetry.summary())
+            self.update_tooltip('\n'.join(lines))
+
+
+class BitmapSegmentbar(Segmentbar):
+    """segment progressbar drawn as a single image instead of a rectangle per segment
+
+    pixel columns coverage stored in a one-pixel-high row "bytearray", only columns that change get painted on a
+    PhotoImage that fill widget height, so rendering cost doesn't depend on segments count, which is useful for very
+    fragmented downloads
+
+    Example:
+        sb = BitmapSegmentbar(root, width=200)
+        sb.pack(fill='x')
+        sb.ubdate_bars([400, [(20, 10), (100, 55)]])
+    """
+
+    def __init__(self, master, bg=None, fg=None, width=100, height=10, fps=30):
+        super().__init__(master, bg=bg, fg=fg, width=width, height=height, fps=fps)
+        self.bg = self.cget('background')
+        self.row = bytearray(self.width)  # 1 for filled pixel column, 0 for empty
+        self.img = tk.PhotoImage(master=self, width=self.width, height=self.height)
+        self.img.put(self.bg, to=(0, 0, self.width, self.height))
+        self.create_image(0, 0, image=self.img, anchor='nw')
+
+    def update_bar(self, info):
+        """paint empty pixel columns in range
+
+        Args:
+            info (2-tuple): (start pixel, end pixel)
+
+        Returns:
+            (bool): True if image changed
+        """
+        start, end = info
+        start, end = max(start, 0), min(end, self.width)
+        row = self.row
+        changed = False
+
+        # paint each run of empty columns
+        x = row.find(0, start, end)
+        while x != -1:
+            run_end = row.find(1, x, end)
+            run_end = end if run_end == -1 else run_end
+            self.img.put(self.fg, to=(x, 0, run_end, self.height))
+            x = row.find(0, run_end, end)
+            changed = True
+
+        if changed:
+            row[start:end] = b'\x01' * (end - start)
+
+        return changed
+
+    def clear_bars(self):
+        """reset coverage row and image to current widget size"""
+        self.row = bytearray(self.width)
+        self.img.configure(width=self.width, height=self.height)
+        self.img.put(self.bg, to=(0, 0, self.width, self.height))
+
+
+class CoveragePyramid:
+    """multi-resolution summary of covered ranges, used to render a zoomed view of a huge range in O(pixels)
+
+    level 0 splits total size into equal buckets, each one holds number of covered bytes inside it, every upper level
+    has half the buckets of the level below it, where each bucket is the sum of two buckets
+
+    Example:
+        pyramid = CoveragePyramid(total=10 * 1024 ** 3)
+        pyramid.add(0, 4096)  # ranges must not overlap, use IntervalSet.gaps() to get new parts of a range
+        pyramid.covered(0, 1024 ** 2)  # 4096
+    """
+
+    def __init__(self, total, buckets=65536):
+        """initialize
+
+        Args:
+            total (int): total size
+            buckets (int): number of buckets in level 0, i.e. max. resolution
+        """
+        self.total = total
+        self.bucket_size = max(-(-total // buckets), 1)
+        # level 0 buckets are bigger than 1/8 of shorter ranges, so covered() is less accurate for them
+        self.min_range = self.bucket_size * 8
+        count = max(-(-total // self.bucket_size), 1)
+
+        self.levels = []
+        while True:
+            self.levels.append(array('q', [0]) * count)
+            if count == 1:
+                break
+            count = (count + 1) // 2
+
+    def add(self, start, end):
+        """add a covered range, it must not overlap any range added before"""
+        start, end = max(start, 0), min(end, self.total)
+        if end <= start:
+            return
+
+        size = self.bucket_size
+        buckets = self.levels[0]
+        first, last = start // size, (end - 1) // size
+        for i in range(first, last + 1):
+            buckets[i] += min(end, (i + 1) * size) - max(start, i * size)
+
+        # update parents of changed buckets only
+        for lower, upper in zip(self.levels, self.levels[1:]):
+            first, last = first // 2, last // 2
+            for i in range(first, last + 1):
+                upper[i] = lower[2 * i] + (lower[2 * i + 1] if 2 * i + 1 < len(lower) else 0)
+
+    def covered(self, start, end):
+        """approximate number of covered bytes in range [start, end)
+
+        the coarsest level with a bucket size not bigger than 1/8 of range length is used, i.e. bucket size is between
+        1/16 and 1/8 of range length, so at most 17 buckets are read regardless of how many ranges are covered, and
+        error of partially overlapped buckets is small
+        """
+        start, end = max(start, 0), min(end, self.total)
+        if end <= start:
+            return 0
+
+        length = end - start
+        level, size = 0, self.bucket_size
+        # next level bucket size is 2 * size, move up while it is not bigger than length / 8
+        while level + 1 < len(self.levels) and size * 16 <= length:
+            level += 1
+            size *= 2
+
+        buckets = self.levels[level]
+        result = 0
+        for i in range(start // size, (end - 1) // size + 1):
+            b0, b1 = i * size, min((i + 1) * size, self.total)
+            overlap = min(end, b1) - max(start, b0)
+            # assume coverage is evenly distributed inside a partially overlapped bucket
+            result += buckets[i] if overlap == b1 - b0 else buckets[i] * overlap // (b1 - b0)
+
+        return result
+
+
+class ZoomableSegmentbar(Segmentbar):
+    """segment progressbar with zoom and pan, useful to inspect missing ranges of very large files
+
+    every pixel column is shaded by the fill ratio of the range it covers, ratios come from a CoveragePyramid, so
+    rendering any zoom level costs O(visible pixels) not O(segments)
+
+    mouse controls:
+        Control + mousewheel: zoom in / out around mouse pointer
+        drag with left button: pan
+        double click: reset zoom
+
+    Example:
+        sb = ZoomableSegmentbar(root, width=400, height=20)
+        sb.pack(fill='x')
+        sb.reset(50 * 1024 ** 3)
+        sb.add_range(0, 1024 ** 2)
+        sb.zoom(100)
+    """
+
+    def __init__(self, master, bg=None, fg=None, width=100, height=10, fps=30, resolution=65536, shades=16):
+        """initialize
+
+        Args:
+            resolution (int): number of buckets in coverage summary, zooming beyond this resolution will use exact
+                              ranges
+            shades (int): number of colors between background and foreground used to show partially filled pixels
+            other arguments: see Segmentbar
+        """
+        super().__init__(master, bg=bg, fg=fg, width=width, height=height, fps=fps)
+        self.resolution = resolution
+        self.pyramid = CoveragePyramid(0, resolution)
+        self.view_start = 0
+        self.view_end = 0
+        self.drag_x = None
+
+        # blend colors from background to foreground
+        bg_rgb = [x // 256 for x in self.winfo_rgb(self.cget('background'))]
+        fg_rgb = [x // 256 for x in self.winfo_rgb(self.fg)]
+        self.palette = [rgb2hex(*[b + (f - b) * i // (shades - 1) for b, f in zip(bg_rgb, fg_rgb)])
+                        for i in range(shades)]
+
+        self.img = tk.PhotoImage(master=self, width=self.width, height=self.height)
+        self.create_image(0, 0, image=self.img, anchor='nw')
+        self.render_id = None
+
+        for seq in ('<Control-MouseWheel>', '<Control-Button-4>', '<Control-Button-5>'):
+            self.bind(seq, self.on_zoom)
+        self.bind('<ButtonPress-1>', self.on_press)
+        self.bind('<B1-Motion>', self.on_drag)
+        self.bind('<Double-Button-1>', lambda event: self.reset_zoom())
+
+        self.schedule_render()
+
+    def fill(self, start, end):
+        """mark range [start, end) as downloaded
+
+        Returns:
+            (bool): True if range has new parts
+        """
+        gaps = self.segments.gaps(start, end) if end > start else None
+        if not gaps:
+            return False
+
+        self.segments.add(start, end)
+        for s, e in gaps:
+            self.pyramid.add(s, e)
+        self.report_progress(sum(e - s for s, e in gaps))
+
+        self.schedule_render()
+        return True
+
+    def clear_bars(self):
+        """reset coverage summary and zoom"""
+        self.pyramid = CoveragePyramid(self.total, self.resolution)
+        self.view_start, self.view_end = 0, self.total
+        self.schedule_render()
+
+    def redraw(self, *args):
+        width = max(self.winfo_width(), 1)
+        height = max(self.winfo_height(), 1)
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self.img.configure(width=width, height=height)
+            self.schedule_render()
+
+    def schedule_render(self):
+        if self.render_id is None and self.visible:
+            self.render_id = self.after_idle(self.render)
+
+    def on_visibility(self, visible):
+        """render changes made while bar was invisible"""
+        if visible:
+            self.schedule_render()
+
+    def pixel_range(self, x):
+        """get range [start, end) covered by pixel column x in current view"""
+        span = self.view_end - self.view_start
+        start, end = scale_range(x, x + 1, self.width, span)
+        return self.view_start + start, self.view_start + max(end, start + 1)
+
+    def covered(self, start, end):
+        """number of covered bytes in range [start, end)"""
+        if end - start >= self.pyramid.min_range:
+            return self.pyramid.covered(start, end)
+
+        # zoomed beyond pyramid resolution, use exact ranges
+        return sum(min(e, end) - max(s, start) for s, e in self.segments.overlapping(start, end)
+                   if s < end and e > start)
+
+    def render(self):
+        """paint one row of pixel colors stretched over widget height"""
+        self.render_id = None
+        if not self.total:
+            self.img.put(self.palette[0], to=(0, 0, self.width, self.height))
+            return
+
+        last_shade = len(self.palette) - 1
+        colors = []
+        for x in range(self.width):
+            start, end = self.pixel_range(x)
+            covered = self.covered(start, end)
+
+            # any coverage will show at least the lightest shade
+            colors.append(self.palette[-(-covered * last_shade // (end - start))])
+
+        self.img.put('{%s}' % ' '.join(colors), to=(0, 0, self.width, self.height))
+
+    def zoom(self, factor, x=None):
+        """zoom in by factor > 1 or zoom out by factor < 1
+
+        Args:
+            factor (float): zoom factor
+            x (int): pixel column to keep fixed, default is center of widget
+        """
+        if not self.total:
+            return
+
+        x = self.width // 2 if x is None else x
+        span = self.view_end - self.view_start
+        pivot = self.view_start + span * x // self.width
+
+        # minimum span is one byte per pixel
+        new_span = min(max(int(span / factor), self.width, 1), self.total)
+        start = pivot - new_span * x // self.width
+        self.set_view(start, start + new_span)
+
+    def pan(self, dx):
+        """move view by dx pixels, positive values move to the right"""
+        span = self.view_end - self.view_start
+        start = self.view_start + dx * span // self.width
+        self.set_view(start, start + span)
+
+    def set_view(self, start, end):
+        """show range [start, end) of total"""
+        span = min(end - start, self.total)
+        start = min(max(start, 0), self.total - span)
+        self.view_start, self.view_end = start, start + span
+        self.schedule_render()
+
+    def reset_zoom(self):
+        self.set_view(0, self.total)
+
+    def range_at(self, x):
+        """get downloaded range at pixel column x in current view
+
+        Returns:
+            (2-tuple): (start, end) or None
+        """
+        if not self.total:
+            return None
+
+        start, end = self.pixel_range(x)
+        for s, e in self.segments.overlapping(start, end):
+            if s < end and e > start:
+                return s, e
+
+        return None
+
+    def on_zoom(self, event):
+        zoom_in = event.num == 4 or event.delta > 0
+        self.zoom(2 if zoom_in else 0.5, event.x)
+        return 'break'
+
+    def on_press(self, event):
+        self.drag_x = event.x
+
+    def on_drag(self, event):
+        if self.drag_x is not None:
+            self.pan(self.drag_x - event.x)
+            self.drag_x = event.x
+
+
+class SegmentRow:
+    """data of a single row in MultiSegmentbar"""
+
+    def __init__(self, total=0):
+        self.total = total
+        self.segments = IntervalSet()  # downloaded ranges
+        self.streams = {}  # {range start: range end} for ranges reported by add_range() and extend()
+        self.items = []  # canvas items ids
+        self.dirty = True  # row data changed since last drawing
+
+
+class MultiSegmentbar(tk.Canvas):
+    """many segment progressbars drawn as rows of a single canvas
+
+    only rows inside the visible part of canvas are drawn, and only rows whose data changed get redrawn, scaling is
+    the same as Segmentbar
+
+    Example:
+        view = MultiSegmentbar(root, width=300, height=200)
+        view.pack(fill='both', expand=True)
+
+        view.add_row('file1', total=400)
+        view.ubdate_bars('file1', [400, [(20, 10), (100, 55)]])
+
+        # or report changes only, safe to be called from any thread
+        view.add_range('file1', 300, 20)
+        view.extend('file1', 300, 5)
+    """
+
+    def __init__(self, master, bg=None, fg=None, row_bg=None, width=200, height=100, row_height=10, row_gap=4,
+                 fps=30):
+        """initialize
+
+        Args:
+            master: tkinter container
+            bg (str): canvas background
+            fg (str): color of downloaded segments
+            row_bg (str): background color of a row
+            width (int): canvas width
+            height (int): canvas height
+            row_height (int): height of every row
+            row_gap (int): vertical space between rows
+            fps (int): max. number of times per second to apply events queued from other threads
+        """
+        self.master = master
+        master_bg = get_widget_attribute(master, 'background')
+        bg = bg or master_bg
+        self.row_bg = row_bg or calc_contrast_color(bg, 30)
+        self.fg = fg or calc_font_color(self.row_bg)
+        self.row_height = row_height
+        self.row_gap = row_gap
+        self.keys = []  # rows keys in display order
+        self.rows = {}  # {key: SegmentRow}
+        self.drawn = set()  # keys of rows currently drawn on canvas
+        self.width = width
+        self.render_id = None
+        self.frame_time = max(1000 // fps, 1)  # milliseconds
+
+        super().__init__(self.master, bg=bg, width=width, height=height, bd=0, highlightthickness=0,
+                         yscrollincrement=self.row_pitch)
+
+        self.bind('<Configure>', self.on_configure)
+        scroll_with_mousewheel(self)
+
+        # changed rows will be redrawn when canvas become visible
+        track_visibility(self, lambda visible: visible and self.schedule_render())
+
+        self.clock = get_clock(self)
+        self.events = FlushQueue(self, self.flush_events, delay=self.frame_time)  # add_range(), extend(), and reset()
+
+    @property
+    def row_pitch(self):
+        return self.row_height + self.row_gap
+
+    def add_row(self, key, total=0):
+        """add a new row at the bottom
+
+        Args:
+            key: any hashable object to identify this row, e.g. file name
+            total (int): total size
+        """
+        if key in self.rows:
+            return
+
+        self.keys.append(key)
+        self.rows[key] = SegmentRow(total)
+        self.update_scrollregion()
+        self.schedule_render()
+
+    def remove_row(self, key):
+        """remove a row, rows below it will move up"""
+        if key not in self.rows:
+            return
+
+        self.erase_all()
+        self.keys.remove(key)
+        del self.rows[key]
+        self.update_scrollregion()
+        self.schedule_render()
+
+    def ubdate_bars(self, key, segments_progress):
+        """update a row with a snapshot of segments progress, same as Segmentbar.ubdate_bars()
+
+        Args:
+            key: row key
+            segments_progress: list of total size and list of segments, e.g [total size, [(start, length), ...]]
+        """
+        size, segments = segments_progress
+        if key not in self.rows:
+            self.add_row(key, size)
+
+        row = self.rows[key]
+        if size != row.total:
+            self.clear_row(row, size)
+
+        for start, length in segments:
+            self.fill(row, start, start + length)
+
+        if row.dirty:
+            self.schedule_render()
+
+    def add_range(self, key, start, length):
+        """mark a range as downloaded, safe to be called from any thread"""
+        self.events.put(('add', key, start, length))
+
+    def extend(self, key, start, delta):
+        """extend a range that was added by add_range(), safe to be called from any thread"""
+        self.events.put(('extend', key, start, delta))
+
+    def reset(self, key, total=None):
+        """clear all ranges of a row, safe to be called from any thread"""
+        self.events.put(('reset', key, total, None))
+
+    def flush_events(self, events):
+        """apply queued events, runs on tkinter thread at most once per frame"""
+        for kind, key, start, value in events:
+            if key not in self.rows:
+                self.add_row(key)
+            row = self.rows[key]
+
+            if kind == 'add':
+                end = start + value
+                row.streams[start] = max(row.streams.get(start, start), end)
+                self.fill(row, start, end)
+
+            elif kind == 'extend':
+                end = row.streams.get(start, start)
+                row.streams[start] = end + value
+                self.fill(row, end, end + value)
+
+            elif kind == 'reset':
+                self.clear_row(row, row.total if start is None else start)
+
+            if row.dirty:
+                self.schedule_render()
+
+    def fill(self, row, start, end):
+        """mark range [start, end) of a row as downloaded"""
+        if end > start and not row.segments.covers(start, end):
+            row.segments.add(start, end)
+            row.dirty = True
+
+    def clear_row(self, row, total=0):
+        row.total = total
+        row.segments.clear()
+        row.streams.clear()
+        row.dirty = True
+
+    def visible_rows(self):
+        """get indexes range of rows inside visible part of canvas"""
+        top = self.canvasy(0)
+        bottom = self.canvasy(self.winfo_height())
+        first = max(int(top // self.row_pitch), 0)
+        last = min(int(bottom // self.row_pitch) + 1, len(self.keys))
+        return range(first, last)
+
+    def schedule_render(self):
+        if self.render_id is None and self.visible:
+            self.render_id = self.after_idle(self.render)
+
+    def render(self):
+        """draw visible rows that changed, and erase rows scrolled out of view"""
+        self.render_id = None
+        visible = {self.keys[i]: i for i in self.visible_rows()}
+
+        for key in self.drawn - visible.keys():
+            self.erase_row(key)
+
+        for key, index in visible.items():
+            row = self.rows[key]
+            if row.dirty or key not in self.drawn:
+                self.draw_row(key, index)
+
+    def draw_row(self, key, index):
+        row = self.rows[key]
+        if row.items:
+            self.delete(*row.items)
+
+        y0 = index * self.row_pitch
+        y1 = y0 + self.row_height
+        row.items = [self.create_rectangle(0, y0, self.width, y1, fill=self.row_bg, width=0)]
+
+        if row.total:
+            # merge ranges that fall into the same or adjacent pixel columns
+            pixels = IntervalSet(scale_range(start, end, row.total, self.width) for start, end in row.segments)
+            for x0, x1 in pixels:
+                row.items.append(self.create_rectangle(x0, y0, x1, y1, fill=self.fg, width=0))
+
+        row.dirty = False
+        self.drawn.add(key)
+
+    def erase_row(self, key):
+        row = self.rows.get(key)
+        if row and row.items:
+            self.delete(*row.items)
+            row.items = []
+        self.drawn.discard(key)
+
+    def erase_all(self):
+        for key in list(self.drawn):
+            self.erase_row(key)
+
+    def update_scrollregion(self):
+        self.configure(scrollregion=(0, 0, self.width, len(self.keys) * self.row_pitch))
+
+    def on_configure(self, event):
+        width = max(self.winfo_width(), 1)
+        if width != self.width:
+            self.width = width
+            self.erase_all()
+            self.update_scrollregion()
+        self.schedule_render()
+
+    # redraw after scrolling
+    def yview(self, *args):
+        result = super().yview(*args)
+        if args:
+            self.schedule_render()
+        return result
+
+    def yview_moveto(self, fraction):
+        super().yview_moveto(fraction)
+        self.schedule_render()
+
+    def yview_scroll(self, number, what):
+        super().yview_scroll(number, what)
+        self.schedule_render()
 
 
 if __name__ == '__main__':
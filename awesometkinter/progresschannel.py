@@ -0,0 +1,276 @@
+"""
+    AwesomeTkinter, a new tkinter widgets design using custom styles and images
+
+    :copyright: (c) 2020-2021 by Mahmoud Elshahat.
+
+    module description:
+        progress channel from worker processes to progress widgets using shared memory, workers write counters and
+        ranges bitmaps, and widgets poll it once per frame, no messages are sent per update
+
+        requires python 3.8 or newer for "multiprocessing.shared_memory", the rest of the package works with 3.6
+
+"""
+
+import re
+
+try:
+    from multiprocessing import shared_memory  # python 3.8+
+except ImportError:
+    shared_memory = None
+
+
+class ProgressChannel:
+    """progress counters and ranges bitmaps stored in shared memory
+
+    memory layout, all counters are 64-bit integers:
+        channel header: number of slots, number of bitmap blocks
+        every slot: seq, generation, total, done, then bitmap
+
+    seq: incremented twice by every write, odd value means a write is in progress, readers retry until they get an even
+         unchanged value, "seqlock"
+    generation: incremented by reset(), widgets clear old ranges when it changes
+    bitmap: total size is split into equal blocks, a bit is set when its block is completely downloaded, block i
+            covers bytes from ceil(i * total / blocks) to ceil((i + 1) * total / blocks)
+
+    every slot must have only one writer at a time, e.g. one worker per slot, blocks partially covered by marked ranges
+    are kept by the writer object until filled, a new writer of the same slot should mark its ranges again
+
+    Example:
+        # gui process
+        channel = ProgressChannel(slots=8)
+        bar.attach_channel(channel, slot=0)  # RadialProgressbar or Segmentbar
+        pool.apply_async(download, (url, channel, 0))
+
+        # worker process, channel object can be pickled, it will attach to the same shared memory
+        def download(url, channel, slot):
+            channel.reset(slot, total=file_size)
+            ...
+            channel.add(slot, len(chunk))
+            channel.mark_range(slot, segment_start, segment_current_end)
+
+        # gui process, when finished
+        channel.close()
+        channel.unlink()
+    """
+
+    header_size = 2  # number of counters in channel header
+    counters_size = 4  # number of counters in every slot
+
+    def __init__(self, slots=32, blocks=1024, name=None):
+        """initialize
+
+        Args:
+            slots (int): number of progress slots, e.g. number of workers
+            blocks (int): number of bitmap blocks for every slot, should be near width of Segmentbar in pixels
+            name (str): name of an existing channel to attach to, slots and blocks will be read from shared memory
+        """
+        if shared_memory is None:
+            raise RuntimeError('ProgressChannel requires python 3.8 or newer, '
+                               '"multiprocessing.shared_memory" is missing')
+
+        if name:
+            self.shm = shared_memory.SharedMemory(name=name)
+            header = self.shm.buf[:self.header_size * 8].cast('q')
+            slots, blocks = header
+            header.release()
+        else:
+            bitmap_size = -(-blocks // 64) * 8  # bytes, rounded up to 8 bytes
+            slot_size = self.counters_size * 8 + bitmap_size
+            self.shm = shared_memory.SharedMemory(create=True, size=self.header_size * 8 + slots * slot_size)
+            header = self.shm.buf[:self.header_size * 8].cast('q')
+            header[0], header[1] = slots, blocks
+            header.release()
+
+        self.owner = not name
+        self.slots = slots
+        self.blocks = blocks
+        self.bitmap_size = -(-blocks // 64) * 8
+        self.partial = {}  # {slot: {block: list of (start, end) marked ranges inside block}}, writer side only
+
+        # memoryviews of every slot
+        self.counters = []
+        self.bitmaps = []
+        offset = self.header_size * 8
+        for _ in range(slots):
+            self.counters.append(self.shm.buf[offset:offset + self.counters_size * 8].cast('q'))
+            offset += self.counters_size * 8
+            self.bitmaps.append(self.shm.buf[offset:offset + self.bitmap_size])
+            offset += self.bitmap_size
+
+    @property
+    def name(self):
+        """shared memory name, used to attach to this channel from another process"""
+        return self.shm.name
+
+    def __reduce__(self):
+        # attach to the same shared memory when unpickled in another process
+        return ProgressChannel, (self.slots, self.blocks, self.name)
+
+    def close(self):
+        """close access to shared memory from this object"""
+        for view in self.counters + self.bitmaps:
+            view.release()
+        self.counters.clear()
+        self.bitmaps.clear()
+        self.shm.close()
+
+    def unlink(self):
+        """destroy shared memory, should be called once by the process that created the channel"""
+        if self.owner:
+            self.shm.unlink()
+
+    # writer methods ---------------------------------------------------------------------------------------------------
+    def begin_write(self, slot):
+        self.counters[slot][0] += 1
+
+    def end_write(self, slot):
+        self.counters[slot][0] += 1
+
+    def reset(self, slot, total=0):
+        """clear slot and set a new total size"""
+        counters = self.counters[slot]
+        self.begin_write(slot)
+        counters[1] += 1
+        counters[2] = total
+        counters[3] = 0
+        self.bitmaps[slot][:] = bytes(self.bitmap_size)
+        self.end_write(slot)
+        self.partial.pop(slot, None)
+
+    def block_range(self, block, total):
+        """bytes range [start, end) of a bitmap block"""
+        return -(-block * total // self.blocks), -(-(block + 1) * total // self.blocks)
+
+    def set_total(self, slot, total):
+        self.begin_write(slot)
+        self.counters[slot][2] = total
+        self.end_write(slot)
+
+    def set_done(self, slot, done):
+        """set number of transferred bytes"""
+        self.begin_write(slot)
+        self.counters[slot][3] = done
+        self.end_write(slot)
+
+    def add(self, slot, size):
+        """add transferred bytes"""
+        self.begin_write(slot)
+        self.counters[slot][3] += size
+        self.end_write(slot)
+
+    def mark_range(self, slot, start, end):
+        """mark range [start, end) as downloaded, a block is marked when it is completely covered
+
+        a block split between two ranges, e.g. two segments of a download, is marked when both of them are marked,
+        it is ok to mark the same range again while it grows, e.g. mark_range(slot, 0, 100) then
+        mark_range(slot, 0, 200)
+        """
+        total = self.counters[slot][2]
+        end = min(end, total)
+        if not total or end <= start:
+            return
+
+        # blocks completely inside range
+        first = -(-start * self.blocks // total)
+        last = end * self.blocks // total
+
+        # blocks at range edges which are partially covered, filled ones will be marked as well
+        filled = []
+        for block in {start * self.blocks // total, first - 1, last}:
+            if 0 <= block < self.blocks and not first <= block < last and self.cover_block(slot, block, start, end):
+                filled.append(block)
+
+        if last <= first and not filled:
+            return
+
+        bitmap = self.bitmaps[slot]
+        self.begin_write(slot)
+        if first < last:
+            self.set_bits(bitmap, first, last)
+        for block in filled:
+            self.set_bits(bitmap, block, block + 1)
+        self.end_write(slot)
+
+    def cover_block(self, slot, block, start, end):
+        """add the part of range [start, end) inside a block to its partial coverage
+
+        Returns:
+            (bool): True if block became completely covered
+        """
+        block_start, block_end = self.block_range(block, self.counters[slot][2])
+        start, end = max(start, block_start), min(end, block_end)
+        if end <= start:
+            return False
+
+        partial = self.partial.setdefault(slot, {})
+        ranges = []
+        for s, e in sorted(partial.get(block, []) + [(start, end)]):
+            if ranges and s <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(e, ranges[-1][1]))
+            else:
+                ranges.append((s, e))
+
+        if ranges == [(block_start, block_end)]:
+            partial.pop(block, None)
+            return True
+
+        partial[block] = ranges
+        return False
+
+    @staticmethod
+    def set_bits(bitmap, first, last):
+        """set bits of blocks from first to last, last not included"""
+        first_byte, last_byte = first // 8, (last - 1) // 8
+        if first_byte == last_byte:
+            bitmap[first_byte] |= (0xff << (first % 8)) & (0xff >> (7 - (last - 1) % 8))
+        else:
+            bitmap[first_byte] |= (0xff << (first % 8)) & 0xff
+            bitmap[first_byte + 1:last_byte] = b'\xff' * (last_byte - first_byte - 1)
+            bitmap[last_byte] |= 0xff >> (7 - (last - 1) % 8)
+
+    # reader methods ---------------------------------------------------------------------------------------------------
+    def read(self, slot, since=None, bitmap=True, retries=100):
+        """read a consistent snapshot of a slot
+
+        Args:
+            slot (int): slot index
+            since (int): seq value of last read, if slot not changed None will be returned
+            bitmap (bool): copy bitmap, use False if only counters are needed
+            retries (int): max. retries while a writer is changing the slot
+
+        Returns:
+            (5-tuple): seq, generation, total, done, bitmap bytes or None, or None if slot not changed or busy
+        """
+        counters = self.counters[slot]
+        for _ in range(retries):
+            seq = counters[0]
+            if seq == since:
+                return None
+            if seq % 2:
+                continue
+
+            generation, total, done = counters[1], counters[2], counters[3]
+            data = bytes(self.bitmaps[slot]) if bitmap else None
+
+            if counters[0] == seq:
+                return seq, generation, total, done, data
+
+        return None
+
+    def bitmap_ranges(self, data, total):
+        """convert bitmap to list of downloaded ranges
+
+        Args:
+            data (bytes): bitmap from read()
+            total (int): total size
+
+        Returns:
+            (list): list of (start, end) ranges
+        """
+        if not total:
+            return []
+
+        # bits as text with block 0 first, then find runs of "1"
+        bits = ''.join(f'{byte:08b}'[::-1] for byte in data)[:self.blocks]
+        return [(self.block_range(m.start(), total)[0], self.block_range(m.end() - 1, total)[1])
+                for m in re.finditer('1+', bits)]
@@ -0,0 +1,178 @@
+"""
+    AwesomeTkinter, a new tkinter widgets design using custom styles and images
+
+    :copyright: (c) 2020-2021 by Mahmoud Elshahat.
+
+    module description:
+        transfer rate and ETA model that can be shared between progress widgets
+
+"""
+
+import threading
+import time
+
+
+def format_bytes(size):
+    """format number of bytes, e.g. 1536 ===> '1.5 KB'"""
+    for unit in ('bytes', 'KB', 'MB', 'GB', 'TB'):
+        if abs(size) < 1024 or unit == 'TB':
+            break
+        size /= 1024
+
+    return f'{size:.0f} {unit}' if unit == 'bytes' else f'{size:.1f} {unit}'
+
+
+def format_time(seconds):
+    """format seconds, e.g. 3725 ===> '1:02:05', and None ===> '--:--'"""
+    if seconds is None:
+        return '--:--'
+
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes:02d}:{seconds:02d}'
+
+
+class TransferTelemetry:
+    """track transfer speed, ETA, and peak speed
+
+    every update costs O(1), only a fixed number of time slots are stored, no samples history
+
+    speed: exponentially weighted moving average of slots rates
+    window_rate: bytes transferred in last "window" seconds divided by window length
+    peak_rate: max. value of speed
+
+    all methods are thread-safe
+
+    Example:
+        telemetry = TransferTelemetry(total=file_size)
+        bar.attach_telemetry(telemetry)
+
+        # from a download thread
+        telemetry.add(len(chunk))
+
+        print(telemetry.speed, telemetry.eta)
+    """
+
+    def __init__(self, total=None, window=5, slots=10, smoothing=0.3):
+        """initialize
+
+        Args:
+            total (int): total size in bytes, None if unknown
+            window (float): length in seconds of window used to calculate window_rate
+            slots (int): number of time slots in window
+            smoothing (float): 0 to 1, weight of newest slot rate in speed average
+        """
+        self.window = window
+        self.slots = slots
+        self.slot_time = window / slots
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.reset(total)
+
+    def reset(self, total=None):
+        """clear all values, and set a new total size"""
+        with self.lock:
+            self.total = total
+            self.done = 0
+            self.ewma = 0
+            self.peak_rate = 0
+            self.start_time = time.monotonic()
+            self.slot_bytes = [0] * self.slots  # bytes transferred in every slot
+            self.current_slot = self.slot_index(self.start_time)
+
+    def slot_index(self, now):
+        return int(now / self.slot_time)
+
+    def advance(self, now):
+        """close finished time slots and update moving average, must be called with lock acquired"""
+        index = self.slot_index(now)
+        passed = index - self.current_slot
+        if passed <= 0:
+            return
+
+        alpha = self.smoothing
+
+        # the slot that was current is complete now
+        rate = self.slot_bytes[self.current_slot % self.slots] / self.slot_time
+        self.ewma = alpha * rate + (1 - alpha) * self.ewma
+        self.peak_rate = max(self.peak_rate, self.ewma)
+
+        # other passed slots had no transfers
+        self.ewma *= (1 - alpha) ** (passed - 1)
+
+        # clear reused slots
+        for i in range(self.current_slot + 1, self.current_slot + 1 + min(passed, self.slots)):
+            self.slot_bytes[i % self.slots] = 0
+
+        self.current_slot = index
+
+    def add(self, size):
+        """add transferred bytes
+
+        Args:
+            size (int): number of new bytes
+        """
+        with self.lock:
+            self._add(size)
+
+    def update(self, done):
+        """set total transferred bytes
+
+        Args:
+            done (int): number of bytes transferred so far
+        """
+        with self.lock:
+            if done > self.done:
+                self._add(done - self.done)
+
+    def seed(self, done):
+        """set bytes transferred before tracking started, e.g. resumed download, they don't count in speed
+
+        Args:
+            done (int): number of bytes, ignored if less than current value
+        """
+        with self.lock:
+            self.done = max(self.done, done)
+
+    def _add(self, size):
+        self.advance(time.monotonic())
+        self.done += size
+        self.slot_bytes[self.current_slot % self.slots] += size
+
+    @property
+    def speed(self):
+        """average speed in bytes per second"""
+        with self.lock:
+            self.advance(time.monotonic())
+            return self.ewma
+
+    @property
+    def window_rate(self):
+        """average speed in bytes per second during last window"""
+        with self.lock:
+            now = time.monotonic()
+            self.advance(now)
+
+            # current slot is not complete
+            elapsed = min(self.window - self.slot_time + now % self.slot_time, now - self.start_time)
+            return sum(self.slot_bytes) / elapsed if elapsed > 0 else 0
+
+    @property
+    def eta(self):
+        """estimated remaining time in seconds, None if unknown"""
+        speed = self.speed
+        if self.total is None or not speed:
+            return None
+        return max(self.total - self.done, 0) / speed
+
+    @property
+    def percent(self):
+        """completion percentage, 0 if total size is unknown"""
+        return self.done * 100 // self.total if self.total else 0
+
+    def summary(self, multiline=True):
+        """text summary of speed, ETA, and peak speed"""
+        sep = '\n' if multiline else ', '
+        return sep.join([f'{format_bytes(self.speed)}/s', f'ETA: {format_time(self.eta)}',
+                         f'peak: {format_bytes(self.peak_rate)}/s'])
@@ -5,12 +5,69 @@
 
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
 from .utils import *
+from .animation import FlushQueue
 from .scrollbar import SimpleScrollbar
 
 
+# wrapper of Text widget command, see ScrolledText.wrap_tk_command()
+TEXT_PROXY = r"""
+namespace eval ::awesometkinter {}
+
+proc ::awesometkinter::deleted_chars {w index1 {index2 ""}} {
+    if {$index2 eq ""} {set index2 "$index1 +1c"}
+    if {[$w compare $index2 > "end-1c"]} {set index2 "end-1c"}
+    if {![$w compare $index1 < $index2]} {return 0}
+    return [$w count -chars $index1 $index2]
+}
+
+proc ::awesometkinter::inserted_chars {pairs} {
+    set count 0
+    foreach {chars tags} $pairs {incr count [string length $chars]}
+    return $count
+}
+
+proc ::awesometkinter::textproxy {w callback args} {
+    set op [lindex $args 0]
+    if {$op eq "edit" && [lindex $args 1] in {undo redo}} {
+        # undo and redo change contents without insert or delete commands, count all characters after them
+        set result [$w {*}$args]
+        $callback total [$w count -chars 1.0 end-1c]
+        return $result
+    }
+    if {$op ni {insert delete replace} || [$w cget -state] eq "disabled"} {
+        return [$w {*}$args]
+    }
+
+    switch -- $op {
+        insert {
+            set delta [inserted_chars [lrange $args 2 end]]
+        }
+        delete {
+            if {[llength $args] > 3} {
+                # many ranges, count all characters after deletion
+                set result [$w {*}$args]
+                $callback total [$w count -chars 1.0 end-1c]
+                return $result
+            }
+            set delta [expr {-[deleted_chars $w {*}[lrange $args 1 end]]}]
+        }
+        replace {
+            set delta [expr {[inserted_chars [lrange $args 3 end]] - [deleted_chars $w {*}[lrange $args 1 2]]}]
+        }
+    }
+
+    set result [$w {*}$args]
+    if {$delta} {$callback delta $delta}
+    return $result
+}
+"""
+
+
 class ScrolledText(tk.Text):
     """Scrolled multiline entry good for log output
 
@@ -24,10 +81,15 @@ class ScrolledText(tk.Text):
     basically, this is a Text widget inside an outer Frame with scrolllbars,
     pack, grid, and place methods for Text will be replaced by outer frame methods
 
+    write() can be called from any thread, written text is inserted once per frame, e.g. for fast log output:
+        text = ScrolledText(root, max_lines=10000)
+        logging.getLogger().addHandler(ScrolledTextHandler(text))
+
     """
 
     def __init__(self, parent, bg='white', fg='black', bd=0, wrap=None, vscroll=True, hscroll=True, autoscroll=True,
-                 max_chars=None, sbar_fg=None, sbar_bg=None, vbar_width=10, hbar_width=10, **kwargs):
+                 max_chars=None, max_lines=None, sbar_fg=None, sbar_bg=None, vbar_width=10, hbar_width=10,
+                 smooth_scroll=False, kinetic_scroll=False, **kwargs):
         """initialize
 
         Args:
@@ -41,10 +103,13 @@ class ScrolledText(tk.Text):
             autoscroll (bool): automatic vertical scrolling
             max_chars (int): maximum characters allowed in Text widget, text will be truncated from the beginning to
                              match the max chars
+            max_lines (int): maximum lines allowed in Text widget, oldest lines will be removed from the beginning
             sbar_fg (str): color of scrollbars' slider
             sbar_bg (str): color of scrollbars' trough, default to frame's background
             vbar_width (int): vertical scrollbar width
             hbar_width (int): horizontal scrollbar width
+            smooth_scroll (bool): spread mousewheel scrolling over many frames instead of jumping a line
+            kinetic_scroll (bool): keep scrolling for a while after mousewheel or touchpad stops
 
         """
 
@@ -55,6 +120,9 @@ class ScrolledText(tk.Text):
         self.hscroll = hscroll
         self.autoscroll = autoscroll
         self.max_chars = max_chars
+        self.max_lines = max_lines
+        self.char_count = 0  # number of characters, updated by every insert, delete, and replace, see count_edit()
+        self.color_tags = {}  # {(text_color, text_bg): tags}
         self.sbar_bg = sbar_bg
         self.sbar_fg = sbar_fg
 
@@ -76,6 +144,9 @@ class ScrolledText(tk.Text):
         tk.Text.__init__(self, self.fr, bg=self.bg, fg=self.fg, bd=self.bd, wrap=wrap, undo='false', **kwargs)
         self.grid(sticky='ewns')
 
+        # count characters of every edit
+        self.wrap_tk_command()
+
         if self.vscroll:
             self.vbar = SimpleScrollbar(self.fr, orient='vertical', command=self.yview, slider_color=self.sbar_fg,
                                         bg=self.sbar_bg, width=vbar_width)
@@ -90,6 +161,15 @@ class ScrolledText(tk.Text):
 
         # bind mouse wheel to scroll
         scroll_with_mousewheel(self)
+        if smooth_scroll or kinetic_scroll:
+            # scroll by pixels, same distance as one line vertically, and 10 characters horizontally
+            font = tkfont.Font(font=self['font'])
+            self.wheel_scroller = WheelScroller(self, smooth=smooth_scroll, kinetic=kinetic_scroll, what='pixels',
+                                                steps=(font.metrics('linespace'), font.measure('0') * 10))
+
+        # autoscroll is deferred while widget is invisible
+        self.scroll_pending = False
+        track_visibility(self, self.on_visibility)
 
         # use outer frame geometry managers
         self.pack = self.fr.pack
@@ -102,9 +182,17 @@ class ScrolledText(tk.Text):
         self.place = self.fr.place
         self.place_forget = self.fr.place_forget
 
+        self.pending = FlushQueue(self, self.insert_pending)  # (text, (text_color, text_bg)) written by write()
+        self.bind('<Destroy>', self.on_destroy, add='+')
+
         # for compatibility
         self.text = self
 
+    def on_destroy(self, event):
+        if event.widget is self:
+            # remove tcl wrapper, Text widget command will be deleted by tkinter
+            self.tk.call('rename', self._w, '')
+
     def set(self, text):
         """replace contents"""
         self.clear()
@@ -116,6 +204,7 @@ class ScrolledText(tk.Text):
                 text = text[delta:]
 
         self.insert("1.0", text)
+        self.remove_extra_lines()
 
         self.scrolltobottom()
 
@@ -123,38 +212,171 @@ class ScrolledText(tk.Text):
         """clear all Text widget contents"""
         self.delete("1.0", tk.END)
 
+    def get_color_tags(self, text_color=None, text_bg=None):
+        """get tags for text colors, tags are configured only once"""
+        key = (text_color, text_bg)
+        tags = self.color_tags.get(key)
+        if tags is None:
+            tags = []
+            if text_color:
+                self.tag_configure(text_color, foreground=text_color)
+                tags.append(text_color)
+
+            if text_bg:
+                self.tag_configure(f'bg_{text_bg}', background=text_bg)
+                tags.append(f'bg_{text_bg}')
+
+            tags = self.color_tags[key] = tuple(tags)
+
+        return tags
+
     def append(self, text, text_color=None, text_bg=None):
         """append text with arbitrary colors"""
 
-        color_tags = []
+        self.insert(tk.END, text, self.get_color_tags(text_color, text_bg))
 
-        if text_color:
-            self.tag_configure(text_color, foreground=text_color)
-            color_tags.append(text_color)
+        self.remove_extra_chars()
+        self.remove_extra_lines()
+
+        self.scrolltobottom()
 
-        if text_bg:
-            self.tag_configure(text_bg, foreground=text_bg)
-            color_tags.append(text_bg)
+    def write(self, text, text_color=None, text_bg=None):
+        """append text with arbitrary colors, safe to be called from any thread
 
-        self.insert(tk.END, text, ','.join(color_tags))
+        text is queued and inserted in next frame together with all text written during this frame
+        """
+        self.pending.put((text, (text_color, text_bg)))
+
+    def flush(self):
+        """insert text written by write() now instead of waiting for next frame, must be called on tkinter thread"""
+        self.pending.run()
+
+    def insert_pending(self, items):
+        """insert all written text at once, then trim and autoscroll once, runs on tkinter thread"""
+        # text that would be trimmed right away is not inserted
+        if self.max_lines:
+            lines = 0
+            for i in range(len(items) - 1, -1, -1):
+                if lines >= self.max_lines:
+                    items = items[i + 1:]
+                    break
+                lines += items[i][0].count('\n')
+
+        # join consecutive text with the same colors, then insert all in one call, i.e. text, tags, text, tags, ...
+        args = []
+        run = []
+        colors = items[0][1]
+        for text, text_colors in items:
+            if text_colors != colors:
+                args += [''.join(run), self.get_color_tags(*colors)]
+                run = []
+                colors = text_colors
+            run.append(text)
+        args += [''.join(run), self.get_color_tags(*colors)]
+
+        self.insert(tk.END, *args)
 
         self.remove_extra_chars()
+        self.remove_extra_lines()
 
         self.scrolltobottom()
 
     def remove_extra_chars(self):
         """remove characters from beginning of Text widget if it exceeds max chars"""
         if self.max_chars:
-            # get current text characters count
-            count = len(self.get("1.0", tk.END))
+            count = self.char_count
             if count > self.max_chars:
                 delta = count - self.max_chars
                 self.delete("1.0", f"1.0 + {delta} chars")
 
+    def remove_extra_lines(self):
+        """remove whole lines from beginning of Text widget if it exceeds max lines"""
+        if self.max_lines:
+            delta = self.line_count - self.max_lines
+            if delta > 0:
+                self.delete("1.0", f"{delta + 1}.0")
+
+    @property
+    def line_count(self):
+        """number of lines, an empty last line is not counted, index lookup doesn't depend on contents size"""
+        line, column = self.index('end-1c').split('.')
+        return int(line) - (column == '0')
+
+    def wrap_tk_command(self):
+        """pass every insert, delete, and replace through a tcl wrapper that report change of characters count
+
+        edits by user, e.g. typing or pasting, call Text widget command directly and don't pass through python
+        methods, tcl wrapper catches them as well, and calls python only when characters count changes, after undo
+        or redo all characters are counted again
+        """
+        self.tk.eval(TEXT_PROXY)
+        self.tk_command = self._w + '_text'
+        self.tk.call('rename', self._w, self.tk_command)
+        self.tk.call('interp', 'alias', '', self._w, '', '::awesometkinter::textproxy', self.tk_command,
+                     self.register(self.count_edit))
+
+    def count_edit(self, kind, value):
+        """called by tcl wrapper with ('delta', change of characters count) or ('total', characters count)"""
+        value = int(value)
+        if kind == 'total':
+            self.char_count = value
+        else:
+            self.char_count += value
+
     def scrolltobottom(self):
         """scroll to bottom if autoscroll enabled and scrollbar position at the bottom"""
         try:
             if self.autoscroll and self.vbar.get()[1] == 1:
-                self.yview_moveto("1.0")
+                if self.visible:
+                    self.yview_moveto("1.0")
+                else:
+                    self.scroll_pending = True
         except:
-            pass 
+            pass
+
+    def on_visibility(self, visible):
+        """apply autoscroll requested while widget was invisible"""
+        if visible and self.scroll_pending:
+            self.scroll_pending = False
+            self.yview_moveto("1.0")
+
+
+class ScrolledTextHandler(logging.Handler):
+    """logging handler that writes log records to a ScrolledText widget, records can be logged from any thread
+
+    Example:
+        text = ScrolledText(root, max_lines=10000)
+        handler = ScrolledTextHandler(text, colors={logging.INFO: 'blue'})
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        logging.getLogger().addHandler(handler)
+    """
+
+    # text color of every level, records with a level between two values use color of the lower level
+    colors = {logging.DEBUG: 'grey', logging.INFO: None, logging.WARNING: 'orange', logging.ERROR: 'red'}
+
+    def __init__(self, widget, level=logging.NOTSET, colors=None):
+        """initialize
+
+        Args:
+            widget (ScrolledText): widget to show log records
+            level (int): min. level of logged records
+            colors (dict): {level: text color}, updates default colors
+        """
+        logging.Handler.__init__(self, level)
+        self.widget = widget
+        self.colors = {**self.colors, **(colors or {})}
+        self.levels = sorted(self.colors)
+
+    def get_color(self, levelno):
+        color = None
+        for level in self.levels:
+            if level > levelno:
+                break
+            color = self.colors[level]
+        return color
+
+    def emit(self, record):
+        try:
+            self.widget.write(self.format(record) + '\n', text_color=self.get_color(record.levelno))
+        except Exception:
+            self.handleError(record)
@@ -16,6 +16,7 @@ from tkinter import ttk
 __package__ = 'awesometkinter'
 
 from .utils import configure_widget
+from .animation import get_clock
 
 
 class ToolTip:
@@ -42,6 +43,7 @@ class ToolTip:
         self.tipwindow = None
         self.label = None
         self.id = None
+        self.clock = get_clock(widget)
         self._id1 = self.widget.bind("<Enter>", self.enter, add='+')
         self._id2 = self.widget.bind("<Leave>", self.leave, add='+')
         self._id3 = self.widget.bind("<ButtonPress>", self.leave, add='+')
@@ -86,11 +88,11 @@ class ToolTip:
 
     def schedule(self):
         self.unschedule()
-        self.id = self.widget.after(self.waittime, self.showtip)
+        self.id = self.clock.schedule(self.waittime, self.showtip)
 
     def unschedule(self):
         if self.id:
-            self.widget.after_cancel(self.id)
+            self.clock.cancel(self.id)
             self.id = None
 
     def showtip(self):
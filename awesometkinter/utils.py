@@ -7,6 +7,15 @@ import PIL
 from PIL import Image, ImageTk, ImageColor, ImageDraw, ImageFilter
 import hashlib
 import io
+import sys
+import threading
+import time
+from collections import deque
+
+if not __package__:
+    __package__ = 'awesometkinter'
+
+from .animation import get_clock
 
 
 def identify_operating_system():
@@ -415,6 +424,190 @@ def apply_gradient(img, gradient='vertical', colors=None, keep_transparency=True
     return img
 
 
+def create_arc_mask(size=100, start=0, end=360, antialias=4):
+    """create a smooth pie slice mask, to cut an arc from a circle made by create_circle()
+
+    Args:
+        size (tuple or list, or int): width and height of mask
+        start (float): starting angle in degrees, measured clockwise from 12 o'clock
+        end (float): ending angle in degrees
+        antialias (int): used to make slice edges smoother
+
+    Returns:
+        PIL image: grayscale "L" mode image, slice area is white and the rest is black
+
+    Example:
+        ring = create_circle(100, color='red')
+        base = create_circle(100, color='grey')
+        img = Image.composite(ring, base, create_arc_mask(100, 0, 90))  # a quarter red arc over a grey ring
+    """
+
+    if isinstance(size, int):
+        size = (size, size)
+
+    if end - start >= 360:
+        return Image.new('L', size, 255)
+
+    # draw a bigger mask then resize it to the requested size
+    big_size = [x * antialias for x in size]
+    mask = Image.new('L', big_size, 0)
+    if end > start:
+        ImageDraw.Draw(mask).pieslice([0, 0, big_size[0] - 1, big_size[1] - 1], start - 90, end - 90, fill=255)
+
+    return mask.resize(tuple(size), Image.BOX)
+
+
+# widgets that scroll themselves with mousewheel, routed mousewheel events will not be taken from them
+NATIVE_SCROLL_CLASSES = ('Text', 'Listbox', 'Treeview', 'Spinbox', 'TSpinbox', 'TCombobox', 'Scale', 'TScale')
+
+
+class WheelScroller:
+    """accumulate mousewheel events of a scrollable widget and scroll it once per frame
+
+    - scroll distance depends on event delta, high-resolution touchpads send many events with small deltas
+    - all events received during one frame are applied by one scroll call, fractions are kept for next frames
+    - smooth: scroll distance is spread over next frames, fast at first then slower
+    - kinetic: scrolling continues after last event and slows down gradually
+
+    one scroller is created automatically for every target of scroll_with_mousewheel(), to change its options:
+        text.wheel_scroller = WheelScroller(text, smooth=True, what='pixels', steps=(20, 80))
+    """
+
+    def __init__(self, widget, smooth=False, kinetic=False, what='units', steps=(1, 10), friction=0.9):
+        """initialize
+
+        Args:
+            widget: scrollable tkinter widget, must have yview_scroll and/or xview_scroll
+            smooth (bool): spread scroll distance over next frames
+            kinetic (bool): keep scrolling after last event
+            what (str): 'units' or 'pixels' if widget supports it, e.g. Text widget
+            steps (tuple): scroll distance in "what" for one wheel notch, (vertical, horizontal)
+            friction (float): 0 to 1, kinetic speed multiplier every frame, lower value stops faster
+        """
+        self.widget = widget
+        self.smooth = smooth
+        self.kinetic = kinetic
+        self.what = what
+        self.steps = steps
+        self.friction = friction
+        self.aqua = widget.tk.call('tk', 'windowingsystem') == 'aqua'
+
+        # values for every axis, [vertical, horizontal]
+        self.pending = [0, 0]  # distance not scrolled yet
+        self.remainder = [0, 0]  # fractions left from previous frames
+        self.fed = [0, 0]  # distance received in current frame
+        self.velocity = [0, 0]  # kinetic speed, distance per frame
+
+        self.clock = get_clock(widget)
+        self.tick_id = None
+
+    def notches(self, event):
+        """number of wheel notches in event, could be a fraction for touchpads, positive means scroll down or right"""
+        if event.num == 4:
+            return -1
+        if event.num == 5:
+            return 1
+
+        # macos delta is 1 per notch, on windows and x11 it is 120
+        return -event.delta if self.aqua else -event.delta / 120
+
+    def feed(self, event, horizontal=False):
+        """add mousewheel event, scrolling happens in next frame"""
+        axis = int(horizontal)
+        distance = self.notches(event) * self.steps[axis]
+        self.pending[axis] += distance
+        self.fed[axis] += distance
+
+        if self.tick_id is None:
+            self.tick_id = self.clock.add(self.tick)
+
+        return 'break'
+
+    def tick(self):
+        moving = False
+
+        for axis, method in enumerate(('yview_scroll', 'xview_scroll')):
+            pending = self.pending[axis]
+            amount = pending * 0.3 if self.smooth and abs(pending) > 1 else pending
+            self.pending[axis] -= amount
+
+            if self.kinetic:
+                if self.fed[axis]:
+                    # average speed while events arrive
+                    self.velocity[axis] = (self.velocity[axis] + self.fed[axis]) / 2
+                elif not self.pending[axis]:
+                    # coasting
+                    amount += self.velocity[axis]
+                    self.velocity[axis] *= self.friction
+                    if abs(self.velocity[axis]) < 0.1:
+                        self.velocity[axis] = 0
+            self.fed[axis] = 0
+
+            amount += self.remainder[axis]
+            count = int(amount)
+            self.remainder[axis] = amount - count
+            if count:
+                getattr(self.widget, method)(count, self.what)
+
+            moving = moving or self.pending[axis] or self.velocity[axis]
+
+        if not moving:
+            self.clock.remove(self.tick_id)
+            self.tick_id = None
+
+
+def scroll_target(target_widget, event, horizontal=False):
+    """scroll target widget according to mousewheel event direction and delta"""
+    scroller = getattr(target_widget, 'wheel_scroller', None)
+    if scroller is None:
+        scroller = target_widget.wheel_scroller = WheelScroller(target_widget)
+
+    return scroller.feed(event, horizontal)
+
+
+def route_mousewheel(event, horizontal=False, modifier=None):
+    """send mousewheel event to nearest ancestor registered by scroll_with_mousewheel(apply_to_children=True)
+
+    called by application-wide bindings, i.e. after widget's own and class bindings
+    """
+    widget = event.widget
+    if isinstance(widget, str):
+        # e.g. combobox popdown menu, which has no python object
+        return
+
+    if getattr(widget, 'mousewheel_excluded', False) or widget.winfo_class() in NATIVE_SCROLL_CLASSES:
+        return
+
+    while widget is not None:
+        route = getattr(widget, 'mousewheel_route', None)
+        if route:
+            target_widget, route_modifier = route
+            if not horizontal:
+                if hasattr(target_widget, 'yview_scroll'):
+                    return scroll_target(target_widget, event)
+            elif route_modifier == modifier and hasattr(target_widget, 'xview_scroll'):
+                return scroll_target(target_widget, event, horizontal=True)
+            return
+
+        widget = widget.master
+
+
+def install_mousewheel_router(widget, modifier):
+    """bind mousewheel events once for all widgets, one set of bindings for every modifier"""
+    root = widget._root()
+    installed = root.__dict__.setdefault('mousewheel_routers', set())
+
+    if None not in installed:
+        installed.add(None)
+        for seq in ("<Button-4>", "<Button-5>", "<MouseWheel>"):
+            root.bind_all(seq, route_mousewheel, add='+')
+
+    if modifier not in installed:
+        installed.add(modifier)
+        for seq in (f"<{modifier}-Button-4>", f"<{modifier}-Button-5>", f"<{modifier}-MouseWheel>"):
+            root.bind_all(seq, lambda event: route_mousewheel(event, horizontal=True, modifier=modifier), add='+')
+
+
 def scroll_with_mousewheel(widget, target=None, modifier='Shift', apply_to_children=False):
     """scroll a widget with mouse wheel
 
@@ -423,71 +616,46 @@ def scroll_with_mousewheel(widget, target=None, modifier='Shift', apply_to_child
         target: scrollable tkinter widget, in case you need "widget" to catch mousewheel event and make another widget
                 to scroll, useful for child widget in a scrollable frame
         modifier (str): Modifier to use with mousewheel to scroll horizontally, default is shift key
-        apply_to_children (bool): bind all children
+        apply_to_children (bool): scroll with mousewheel over any child widget, including children added later,
+                                  except widgets that scroll themselves, e.g. Text, or excluded by unbind_mousewheel()
+
+    children are not bound one by one, application-wide bindings look for the nearest registered ancestor when an
+    event occurs
 
     Examples:
         scroll_with_mousewheel(my_text_widget, target='my_scrollable_frame')
 
         to make a scrollable canvas:
-        for w in my_canvas:
-            scroll_with_mousewheel(w, target=my_canvas)
+        scroll_with_mousewheel(my_canvas, apply_to_children=True)
     """
 
-    def _scroll_with_mousewheel(widget):
-
-        target_widget = target if target else widget
-
-        def scroll_vertically(event):
-            # scroll vertically  ----------------------------------
-            if event.num == 4 or event.delta > 0:
-                target_widget.yview_scroll(-1, "unit")
-
-            elif event.num == 5 or event.delta < 0:
-                target_widget.yview_scroll(1, "unit")
-
-            return 'break'
+    target_widget = target if target else widget
 
-        # bind events for vertical scroll ----------------------------------------------
-        if hasattr(target_widget, 'yview_scroll'):
-            # linux
-            widget.bind("<Button-4>", scroll_vertically, add='+')
-            widget.bind("<Button-5>", scroll_vertically, add='+')
+    # bind events for vertical scroll ----------------------------------------------
+    if hasattr(target_widget, 'yview_scroll'):
+        scroll_vertically = lambda event: scroll_target(target_widget, event)
 
-            # windows and mac
-            widget.bind("<MouseWheel>", scroll_vertically, add='+')
+        # linux
+        widget.bind("<Button-4>", scroll_vertically, add='+')
+        widget.bind("<Button-5>", scroll_vertically, add='+')
 
-        # scroll horizontally ---------------------------------------
-        def scroll_horizontally(event):
-            # scroll horizontally
-            if event.num == 4 or event.delta > 0:
-                target_widget.xview_scroll(-10, "unit")
+        # windows and mac
+        widget.bind("<MouseWheel>", scroll_vertically, add='+')
 
-            elif event.num == 5 or event.delta < 0:
-                target_widget.xview_scroll(10, "unit")
+    # bind events for horizontal scroll ----------------------------------------------
+    if hasattr(target_widget, 'xview_scroll'):
+        scroll_horizontally = lambda event: scroll_target(target_widget, event, horizontal=True)
 
-            return 'break'
+        # linux
+        widget.bind(f"<{modifier}-Button-4>", scroll_horizontally, add='+')
+        widget.bind(f"<{modifier}-Button-5>", scroll_horizontally, add='+')
 
-        # bind events for horizontal scroll ----------------------------------------------
-        if hasattr(target_widget, 'xview_scroll'):
-            # linux
-            widget.bind(f"<{modifier}-Button-4>", scroll_horizontally, add='+')
-            widget.bind(f"<{modifier}-Button-5>", scroll_horizontally, add='+')
-
-            # windows and mac
-            widget.bind(f"<{modifier}-MouseWheel>", scroll_horizontally, add='+')
-
-    _scroll_with_mousewheel(widget)
-
-    def handle_children(w):
-        for child in w.winfo_children():
-            _scroll_with_mousewheel(child)
-
-            # recursive call
-            if child.winfo_children():
-                handle_children(child)
+        # windows and mac
+        widget.bind(f"<{modifier}-MouseWheel>", scroll_horizontally, add='+')
 
     if apply_to_children:
-        handle_children(widget)
+        widget.mousewheel_route = (target_widget, modifier)
+        install_mousewheel_router(widget, modifier)
 
 
 def unbind_mousewheel(widget):
@@ -500,6 +668,143 @@ def unbind_mousewheel(widget):
     # windows and mac
     widget.unbind("<MouseWheel>")
 
+    # exclude from events routed to scrollable ancestors
+    widget.mousewheel_excluded = True
+
+
+def is_in_viewport(widget, scrollable_frame):
+    """check if a widget inside a ScrollableFrame intersects with frame's visible area"""
+    canvas = scrollable_frame.canvas
+    x, y = widget.winfo_rootx(), widget.winfo_rooty()
+    cx, cy = canvas.winfo_rootx(), canvas.winfo_rooty()
+
+    return (x < cx + canvas.winfo_width() and x + widget.winfo_width() > cx and
+            y < cy + canvas.winfo_height() and y + widget.winfo_height() > cy)
+
+
+# get viewable state and root geometry of many widgets in one call
+GEOMETRY_SCRIPT = """{widgets} {
+    set result {}
+    foreach w $widgets {
+        lappend result [winfo viewable $w] [winfo rootx $w] [winfo rooty $w] [winfo width $w] [winfo height $w]
+    }
+    return $result
+}"""
+
+
+def check_viewport(scrollable_frame):
+    """check all widgets tracked by track_visibility() inside a ScrollableFrame, e.g. after scrolling
+
+    geometry of all widgets is read by one tcl call, instead of many winfo calls for every widget
+    """
+    trackers = scrollable_frame.visibility_trackers
+    if not trackers:
+        return
+
+    canvas = scrollable_frame.canvas
+    widgets = list(trackers)
+    try:
+        values = canvas.tk.splitlist(canvas.tk.call('apply', GEOMETRY_SCRIPT, [canvas._w] + [w._w for w in widgets]))
+    except tk.TclError:
+        return
+
+    values = [int(v) for v in values]
+    _, cx, cy, cw, ch = values[:5]
+    for i, widget in enumerate(widgets, 1):
+        viewable, x, y, width, height = values[i * 5: i * 5 + 5]
+        widget.viewports[scrollable_frame] = x < cx + cw and x + width > cx and y < cy + ch and y + height > cy
+        trackers[widget](bool(viewable))
+
+
+def track_visibility(widget, callback):
+    """call callback(visible) whenever a widget become visible or invisible
+
+    widget is invisible if it or any of its ancestors is unmapped, e.g. window iconified or notebook tab hidden, or
+    if it is scrolled outside visible area of a ScrollableFrame, current state is stored in widget.visible
+
+    state is checked once when tkinter is idle, no matter how many map/unmap events occurred, scrolling a
+    ScrollableFrame checks all its tracked widgets together, see check_viewport()
+
+    Args:
+        widget: tkinter widget
+        callback (callable): a function that accept one bool argument
+    """
+    widget.visible = False
+    widget.viewports = {}  # {ScrollableFrame ancestor: True if widget intersects its visible area}
+    check_id = None
+
+    # ancestors from widget up to root window, and ScrollableFrame ancestors that may hide widget
+    ancestors = []
+    w = widget
+    while w is not None:
+        ancestors.append(w)
+        w = w.master
+    viewports = [w for w in ancestors[1:] if hasattr(w, 'visibility_trackers')]
+
+    def update(viewable):
+        visible = viewable and all(widget.viewports.values())
+        if visible != widget.visible:
+            widget.visible = visible
+            callback(visible)
+
+    def check():
+        nonlocal check_id
+        check_id = None
+        try:
+            viewable = bool(widget.winfo_viewable())
+            if viewable:
+                for sf in viewports:
+                    widget.viewports[sf] = is_in_viewport(widget, sf)
+        except tk.TclError:
+            return
+
+        update(viewable)
+
+    def schedule():
+        nonlocal check_id
+        if check_id is None:
+            check_id = widget.after_idle(check)
+
+    # bind map events only once for every ancestor, and keep a set of listeners in it
+    for ancestor in ancestors:
+        if not hasattr(ancestor, 'visibility_listeners'):
+            ancestor.visibility_listeners = set()
+            for seq in ('<Map>', '<Unmap>'):
+                ancestor.bind(seq, lambda event, a=ancestor: notify_visibility_listeners(a, event), add='+')
+        ancestor.visibility_listeners.add(schedule)
+
+    for sf in viewports:
+        sf.visibility_trackers[widget] = update
+        sf.watch_viewport()
+
+    def on_destroy(event):
+        if event.widget is widget:
+            for a in ancestors:
+                a.visibility_listeners.discard(schedule)
+            for sf in viewports:
+                sf.visibility_trackers.pop(widget, None)
+                try:
+                    sf.watch_viewport()
+                except tk.TclError:
+                    # ScrollableFrame is being destroyed as well
+                    pass
+            if check_id:
+                widget.after_cancel(check_id)
+
+    widget.bind('<Destroy>', on_destroy, add='+')
+
+    # a widget that is already shown doesn't wait for a map event
+    if widget.winfo_viewable():
+        check()
+
+
+def notify_visibility_listeners(ancestor, event):
+    """notify visibility listeners of an ancestor when it is mapped or unmapped"""
+    # bindings on a toplevel get events of all its children as well
+    if event.widget is ancestor:
+        for func in list(ancestor.visibility_listeners):
+            func()
+
 
 def get_widget_attribute(widget, attr):
     """get an attribute of a widget
@@ -610,8 +915,209 @@ def center_window(window, width=None, height=None, set_geometry_wh=True, referen
         window.eval('tk::PlaceWindow . center')
 
 
+class UIDispatcher:
+    """run functions and widgets' methods on tkinter thread, posted from any thread
+
+    posted messages are executed in batches once per frame, and every batch stops when its time budget is consumed,
+    remaining messages wait for next frame, nothing runs while queue is empty
+
+    messages posted with the same key are collapsed, only the latest one will be executed, e.g. progress updates
+
+    if queue is full, "policy" decides what happens to a new message:
+        'block': wait until there is a free space in queue, messages posted from tkinter thread never block
+        'drop_newest': discard new message
+        'drop_oldest': discard oldest message in queue
+
+    Example:
+        dispatcher = UIDispatcher(root)
+
+        # from a worker thread
+        dispatcher.post(label.config, text='done')
+        dispatcher.post((bar, 'set', (55,)), key='bar')  # (widget, method name, args) message
+
+        print(dispatcher.depth, dispatcher.avg_latency)
+    """
+
+    def __init__(self, widget, budget=8, maxsize=10000, policy='block', fps=30):
+        """initialize
+
+        Args:
+            widget: any tkinter widget, used to schedule processing on tkinter thread
+            budget (float): max. milliseconds spent executing messages in one frame
+            maxsize (int): max. number of messages waiting in queue
+            policy (str): what to do with new messages when queue is full, 'block', 'drop_newest', or 'drop_oldest'
+            fps (int): max. number of batches per second, batches run on the shared animation clock, so a value higher
+                       than clock fps has no effect, see AnimationClock.set_fps()
+        """
+        if policy not in ('block', 'drop_newest', 'drop_oldest'):
+            raise ValueError(f'unknown policy: {policy}')
+
+        self.widget = widget
+        self.budget = budget / 1000  # seconds
+        self.maxsize = maxsize
+        self.policy = policy
+        self.tk_thread = threading.get_ident()
+
+        self.queue = deque()  # [key, func, args, kwargs, posted time]
+        self.keyed = {}  # {key: queued message}
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.process_posted = False  # process() is scheduled for waiting messages
+        self.closed = False
+        self.frame_time = max(1000 // fps, 1)  # milliseconds
+
+        # metrics
+        self.posted = 0  # number of post() calls
+        self.executed = 0  # number of executed messages
+        self.collapsed = 0  # messages replaced by a newer message with the same key
+        self.dropped = 0  # messages discarded because queue was full
+        self.max_depth = 0  # max. number of waiting messages
+        self.latency = 0  # seconds between posting and executing last message
+        self.avg_latency = 0  # moving average of latency
+        self.max_latency = 0
+
+        self.clock = get_clock(widget)
+
+    @property
+    def depth(self):
+        """number of waiting messages"""
+        return len(self.queue)
+
+    def post(self, target, *args, key=None, timeout=None, **kwargs):
+        """queue a message to be executed on tkinter thread, safe to be called from any thread
+
+        Args:
+            target: a callable, or a tuple of (widget, method name or callable, args)
+            args: callable arguments
+            key: any hashable object, waiting message with the same key will be replaced by this message
+            timeout (float): max. seconds to wait if queue is full and policy is 'block'
+            kwargs: callable keyword arguments
+
+        Returns:
+            (bool): False if message is dropped or dispatcher is closed
+        """
+        if isinstance(target, tuple):
+            widget, method, args = (target + ((),))[:3]
+            target = getattr(widget, method) if isinstance(method, str) else method
+
+        with self.lock:
+            if self.closed:
+                return False
+
+            self.posted += 1
+
+            # replace waiting message with the same key
+            if key is not None and key in self.keyed:
+                message = self.keyed[key]
+                message[1:4] = target, args, kwargs
+                self.collapsed += 1
+                return True
+
+            if len(self.queue) >= self.maxsize:
+                if self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+
+                elif self.policy == 'drop_oldest':
+                    self.discard(self.queue.popleft())
+                    self.dropped += 1
+
+                # never block tkinter thread, it is the one which empties the queue
+                elif threading.get_ident() != self.tk_thread:
+                    if not self.not_full.wait_for(lambda: self.closed or len(self.queue) < self.maxsize, timeout):
+                        self.dropped += 1
+                        return False
+
+                    # closed while waiting
+                    if self.closed:
+                        self.dropped += 1
+                        return False
+
+            message = [key, target, args, kwargs, time.monotonic()]
+            self.queue.append(message)
+            if key is not None:
+                self.keyed[key] = message
+
+            self.max_depth = max(self.max_depth, len(self.queue))
+
+            # first message in an empty queue schedules processing
+            schedule = not self.process_posted
+            if schedule:
+                self.process_posted = True
+
+        if schedule:
+            self.clock.post(0, self.process)
+
+        return True
+
+    def discard(self, message):
+        """remove key of a message taken out of the queue, must be called with lock acquired"""
+        key = message[0]
+        if key is not None and self.keyed.get(key) is message:
+            del self.keyed[key]
+
+    def process(self):
+        """execute waiting messages until time budget is consumed, runs on tkinter thread at most once per frame"""
+        with self.lock:
+            self.process_posted = False
+
+        if self.closed:
+            return
+
+        start = time.monotonic()
+
+        while self.queue and time.monotonic() - start < self.budget:
+            with self.lock:
+                message = self.queue.popleft()
+                self.discard(message)
+                self.not_full.notify()
+
+            _, func, args, kwargs, posted_time = message
+            try:
+                func(*args, **kwargs)
+            except tk.TclError:
+                # widget destroyed
+                pass
+            except Exception:
+                self.widget.report_callback_exception(*sys.exc_info())
+
+            self.executed += 1
+            self.latency = time.monotonic() - posted_time
+            self.avg_latency = 0.9 * self.avg_latency + 0.1 * self.latency
+            self.max_latency = max(self.max_latency, self.latency)
+
+        # remaining messages wait for next frame
+        with self.lock:
+            schedule = bool(self.queue) and not self.process_posted
+            if schedule:
+                self.process_posted = True
+
+        if schedule:
+            self.clock.schedule(self.frame_time, self.process)
+
+    def stats(self):
+        """get current metrics
+
+        Returns:
+            (dict): queue depth, counters, and latencies in seconds
+        """
+        return {'depth': self.depth, 'max_depth': self.max_depth, 'posted': self.posted, 'executed': self.executed,
+                'collapsed': self.collapsed, 'dropped': self.dropped, 'latency': self.latency,
+                'avg_latency': self.avg_latency, 'max_latency': self.max_latency}
+
+    def close(self):
+        """stop processing messages, waiting messages are dropped and blocked producers return False"""
+        with self.lock:
+            self.closed = True
+            self.dropped += len(self.queue)
+            self.queue.clear()
+            self.keyed.clear()
+            self.not_full.notify_all()
+
+
 __all__ = ['identify_operating_system', 'calc_md5', 'generate_unique_name', 'invert_color', 'rgb2hex',
            'change_img_color', 'resize_img', 'mix_images', 'color_to_rgba', 'is_dark', 'calc_font_color',
            'calc_contrast_color', 'text_to_image', 'create_pil_image', 'create_image', 'create_circle',
-           'scroll_with_mousewheel', 'unbind_mousewheel', 'get_widget_attribute', 'ImageTk', 'set_default_theme',
-           'theme_compatibility_check', 'configure_widget', 'center_window']
+           'create_arc_mask', 'WheelScroller', 'scroll_with_mousewheel', 'unbind_mousewheel', 'get_widget_attribute',
+           'ImageTk', 'set_default_theme', 'theme_compatibility_check', 'configure_widget', 'center_window',
+           'track_visibility', 'check_viewport', 'UIDispatcher']
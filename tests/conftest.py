@@ -0,0 +1,47 @@
+import tkinter as tk
+
+import pytest
+
+
+@pytest.fixture
+def root():
+    """tkinter root window, tests that need it are skipped if there is no display"""
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f'no display: {e}')
+
+    # exceptions in tkinter callbacks are printed by default, collect them to fail the test instead
+    errors = []
+    root.report_callback_exception = lambda *args: errors.append(args)
+    root.callback_errors = errors
+
+    yield root
+    root.destroy()
+
+
+class FakeRoot:
+    """minimal root window for AnimationClock, "after" callbacks are stored in pending list and never run by itself"""
+
+    def __init__(self):
+        self.tk = object()  # no createfilehandler
+        self.pending = []
+
+    def _root(self):
+        return self
+
+    def after(self, ms, func, *args):
+        self.pending.append((func, args))
+        return len(self.pending)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def report_callback_exception(self, *args):
+        raise args[1]
+
+
+@pytest.fixture
+def fake_root():
+    """stand-in root window for code that only needs "after" and an animation clock, works without a display"""
+    return FakeRoot()
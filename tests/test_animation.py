@@ -0,0 +1,54 @@
+import threading
+
+from awesometkinter.animation import FlushQueue, get_clock
+
+
+def run_pending(root):
+    """run "after" callbacks scheduled so far, except inbox polling"""
+    clock = get_clock(root)
+    while True:
+        pending = [(func, args) for func, args in root.pending if func != clock.poll_inbox]
+        root.pending.clear()
+        if not pending:
+            return
+        for func, args in pending:
+            func(*args)
+
+
+def test_clock_is_idle_without_callbacks(fake_root):
+    root = fake_root
+    clock = get_clock(root)
+    assert not clock.callbacks
+    assert clock.tick_id is None
+
+
+def test_items_from_threads_are_flushed_in_one_batch(fake_root):
+    root = fake_root
+    batches = []
+    queue = FlushQueue(root, batches.append)
+
+    threads = [threading.Thread(target=queue.put, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # cross-thread posts are collected by inbox polling when there is no wakeup pipe
+    get_clock(root).read_inbox()
+    run_pending(root)
+    assert len(batches) == 1
+    assert sorted(batches[0]) == list(range(10))
+    assert not get_clock(root).callbacks
+
+
+def test_put_after_flush_schedules_again(fake_root):
+    root = fake_root
+    batches = []
+    queue = FlushQueue(root, batches.append)
+
+    queue.put('a')
+    queue.put('b')
+    run_pending(root)
+    queue.put('c')
+    run_pending(root)
+    assert batches == [['a', 'b'], ['c']]
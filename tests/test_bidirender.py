@@ -0,0 +1,45 @@
+from awesometkinter.bidirender import (FINAL, INITIAL, ISOLATED, MEDIAL, TATWEEL, UNSHAPED,
+                                       generate_shaping_tables)
+
+BEH = 'ب'
+ALEF = 'ا'
+LAM = 'ل'
+HAMZA = 'ء'
+
+shapes_table, shapes_map, joining_types, liga_table, derender_table = generate_shaping_tables()
+
+
+def test_dual_joining_letter_has_all_shapes():
+    shapes = shapes_map[BEH]
+    assert shapes[UNSHAPED] == BEH
+    assert shapes[ISOLATED] == 'ﺏ'
+    assert shapes[FINAL] == 'ﺐ'
+    assert shapes[INITIAL] == 'ﺑ'
+    assert shapes[MEDIAL] == 'ﺒ'
+    assert joining_types[BEH] == 'D'
+
+    # every shape maps back to the same letter
+    for form in shapes[1:]:
+        assert shapes_map[form] is shapes
+        assert derender_table[ord(form)] == BEH
+
+
+def test_joining_types():
+    assert joining_types[ALEF] == 'R'
+    assert joining_types[HAMZA] == 'U'
+    assert joining_types[TATWEEL] == 'C'
+
+
+def test_lam_alef_ligatures():
+    lam = shapes_map[LAM]
+    alef_final = shapes_map[ALEF][FINAL]
+    assert liga_table[(lam[INITIAL], alef_final)] == 'ﻻ'
+    assert liga_table[(lam[MEDIAL], alef_final)] == 'ﻼ'
+
+    # ligature is derendered to alef then lam in visual order
+    assert derender_table[0xFEFB] == ALEF + LAM
+
+
+def test_table_is_sorted_by_base_letter():
+    letters = [shapes[UNSHAPED] for shapes in shapes_table if shapes[UNSHAPED]]
+    assert letters == sorted(letters)
@@ -0,0 +1,42 @@
+import threading
+
+from awesometkinter.utils import UIDispatcher
+
+
+def test_close_wakes_blocked_producer(fake_root):
+    dispatcher = UIDispatcher(fake_root, maxsize=1)
+    results = []
+
+    def produce():
+        for i in range(3):
+            results.append(dispatcher.post(print, i))
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive()  # blocked on a full queue
+
+    dispatcher.close()
+    producer.join(1)
+    assert not producer.is_alive()
+    assert results == [True, False, False]
+    assert dispatcher.depth == 0
+
+
+def test_post_after_close_is_rejected(fake_root):
+    dispatcher = UIDispatcher(fake_root)
+    dispatcher.close()
+    assert dispatcher.post(print, 'late') is False
+    assert dispatcher.depth == 0
+
+
+def test_messages_with_same_key_are_collapsed(fake_root):
+    dispatcher = UIDispatcher(fake_root)
+    values = []
+    for i in range(5):
+        dispatcher.post(values.append, i, key='progress')
+    assert dispatcher.depth == 1
+    assert dispatcher.collapsed == 4
+
+    dispatcher.process()
+    assert values == [4]
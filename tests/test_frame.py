@@ -0,0 +1,30 @@
+import tkinter as tk
+
+from awesometkinter import ScrollableFrame
+from awesometkinter.utils import track_visibility
+
+
+def test_scroll_updates_tracked_child_visibility(root):
+    root.geometry('200x200')
+    frame = ScrollableFrame(root)
+    frame.pack(fill='both', expand=True)
+
+    for i in range(50):
+        tk.Label(frame, text=f'row {i}').pack()
+    last = tk.Label(frame, text='last')
+    last.pack()
+
+    states = []
+    track_visibility(last, states.append)
+    root.update()
+    assert not last.visible
+
+    frame.scrolltobottom()
+    root.update()
+    assert last.visible
+    assert states[-1] is True
+
+    frame.scrolltotop()
+    root.update()
+    assert not last.visible
+    assert not root.callback_errors
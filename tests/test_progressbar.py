@@ -0,0 +1,86 @@
+from awesometkinter.progressbar import CoveragePyramid, IntervalSet, scale_range
+
+
+def test_interval_set_merges_overlapping_and_adjacent_ranges():
+    ranges = IntervalSet()
+    ranges.add(10, 20)
+    ranges.add(30, 40)
+    assert ranges.add(20, 25) == (10, 25)  # adjacent
+    assert ranges.add(24, 31) == (10, 40)  # bridges both ranges
+    assert list(ranges) == [(10, 40)]
+    assert ranges.covered == 30
+
+
+def test_interval_set_ignores_empty_range():
+    ranges = IntervalSet([(0, 5)])
+    assert ranges.add(7, 7) is None
+    assert ranges.add(9, 3) is None
+    assert list(ranges) == [(0, 5)]
+
+
+def test_interval_set_lookup():
+    ranges = IntervalSet([(0, 10), (20, 30)])
+    assert ranges.find(0) == (0, 10)
+    assert ranges.find(10) is None  # end is not included
+    assert ranges.find(25) == (20, 30)
+    assert ranges.covers(20, 30)
+    assert not ranges.covers(5, 25)
+    assert ranges.overlapping(10, 20) == [(0, 10), (20, 30)]  # touching ranges are included
+
+
+def test_interval_set_gaps():
+    ranges = IntervalSet([(10, 20), (30, 40)])
+    assert ranges.gaps(0, 50) == [(0, 10), (20, 30), (40, 50)]
+    assert ranges.gaps(12, 18) == []
+    assert ranges.gaps(15, 35) == [(20, 30)]
+
+
+def test_interval_set_clear():
+    ranges = IntervalSet([(0, 10)])
+    ranges.clear()
+    assert len(ranges) == 0
+    assert ranges.covered == 0
+
+
+def test_scale_range_includes_partial_pixels():
+    assert scale_range(0, 500, 1000, 100) == (0, 50)
+    assert scale_range(5, 15, 1000, 100) == (0, 2)
+    assert scale_range(999, 1000, 1000, 100) == (99, 100)
+
+
+def test_scale_range_is_exact_for_huge_totals():
+    total = 2 ** 62 + 1
+    assert scale_range(total - 1, total, total, 1000) == (999, 1000)
+    assert scale_range(0, 1, total, 1000) == (0, 1)
+
+
+def test_coverage_pyramid_counts_whole_and_partial_buckets():
+    pyramid = CoveragePyramid(total=1000, buckets=100)
+    pyramid.add(0, 100)
+    pyramid.add(500, 505)
+    assert pyramid.covered(0, 1000) == 105
+    assert pyramid.covered(0, 100) == 100
+    assert pyramid.covered(500, 510) == 5
+    assert pyramid.covered(120, 480) == 0
+
+    # a 400 bytes range reads 40 bytes buckets, edge buckets [80, 120) and [480, 520) are half overlapped and their
+    # coverage is assumed to be evenly distributed
+    assert pyramid.covered(100, 500) == 20 * 20 // 40 + 5 * 20 // 40
+    assert pyramid.levels[-1][0] == 105
+
+
+def test_coverage_pyramid_clips_ranges_to_total():
+    pyramid = CoveragePyramid(total=1000, buckets=100)
+    pyramid.add(-50, 20)
+    pyramid.add(990, 2000)
+    assert pyramid.covered(0, 1000) == 30
+    assert pyramid.covered(2000, 3000) == 0
+
+
+def test_coverage_pyramid_uneven_levels():
+    # odd number of buckets in some levels
+    pyramid = CoveragePyramid(total=999, buckets=37)
+    for start in range(0, 999, 2):
+        pyramid.add(start, start + 1)
+    assert pyramid.levels[-1][0] == 500
+    assert abs(pyramid.covered(0, 999) - 500) <= 1
@@ -0,0 +1,105 @@
+import pickle
+
+import pytest
+
+from awesometkinter.progresschannel import ProgressChannel, shared_memory
+
+pytestmark = pytest.mark.skipif(shared_memory is None, reason='multiprocessing.shared_memory requires python 3.8')
+
+
+@pytest.fixture
+def channel():
+    channel = ProgressChannel(slots=2, blocks=100)
+    yield channel
+    channel.close()
+    channel.unlink()
+
+
+def ranges(channel, slot=0):
+    seq, generation, total, done, data = channel.read(slot)
+    return channel.bitmap_ranges(data, total)
+
+
+def test_block_split_between_two_ranges_is_marked(channel):
+    channel.reset(0, total=1000)
+    channel.mark_range(0, 0, 505)
+    assert ranges(channel) == [(0, 500)]
+
+    channel.mark_range(0, 505, 1000)
+    assert ranges(channel) == [(0, 1000)]
+
+
+def test_ranges_inside_one_block_are_merged_in_any_order(channel):
+    channel.reset(0, total=1000)
+    for start, end in [(502, 504), (506, 510), (500, 502)]:
+        channel.mark_range(0, start, end)
+    assert ranges(channel) == []
+
+    channel.mark_range(0, 504, 506)
+    assert ranges(channel) == [(500, 510)]
+
+
+def test_growing_range_is_not_counted_twice(channel):
+    channel.reset(0, total=1000)
+    channel.mark_range(0, 0, 5)
+    channel.mark_range(0, 0, 8)
+    channel.mark_range(0, 0, 8)
+    assert ranges(channel) == []
+
+    channel.mark_range(0, 0, 10)
+    assert ranges(channel) == [(0, 10)]
+
+
+def test_uneven_blocks_cover_whole_file(channel):
+    channel.reset(0, total=1003)
+    for start in range(0, 1003, 7):
+        channel.mark_range(0, start, start + 7)
+    assert ranges(channel) == [(0, 1003)]
+
+
+def test_gap_stays_unmarked(channel):
+    channel.reset(0, total=1000)
+    channel.mark_range(0, 0, 503)
+    channel.mark_range(0, 507, 1000)
+    assert ranges(channel) == [(0, 500), (510, 1000)]
+
+
+def test_reset_clears_ranges_and_partial_blocks(channel):
+    channel.reset(0, total=1000)
+    channel.mark_range(0, 0, 505)
+    channel.reset(0, total=1000)
+    channel.mark_range(0, 505, 1000)
+    assert ranges(channel) == [(510, 1000)]
+
+
+def test_read_returns_consistent_snapshot(channel):
+    channel.reset(0, total=1000)
+    channel.add(0, 100)
+    seq, generation, total, done, data = channel.read(0)
+    assert seq % 2 == 0
+    assert (generation, total, done) == (1, 1000, 100)
+
+    # slot not changed since last read
+    assert channel.read(0, since=seq) is None
+
+    # writer in progress, odd seq
+    channel.begin_write(0)
+    assert channel.read(0, retries=3) is None
+    channel.end_write(0)
+
+    channel.add(0, 50)
+    snapshot = channel.read(0, since=seq, bitmap=False)
+    assert snapshot[0] > seq
+    assert snapshot[3] == 150
+    assert snapshot[4] is None
+
+
+def test_pickled_channel_shares_memory(channel):
+    other = pickle.loads(pickle.dumps(channel))
+    try:
+        other.reset(1, total=500)
+        other.set_done(1, 200)
+        assert channel.read(1)[2:4] == (500, 200)
+        assert not other.owner
+    finally:
+        other.close()
@@ -0,0 +1,72 @@
+import pytest
+
+from awesometkinter import telemetry as telemetry_module
+from awesometkinter.telemetry import TransferTelemetry, format_bytes, format_time
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """fake monotonic time, advanced by setting clock.now"""
+    class Clock:
+        now = 100.0
+
+    monkeypatch.setattr(telemetry_module.time, 'monotonic', lambda: Clock.now)
+    return Clock
+
+
+def test_speed_eta_and_peak(clock):
+    telemetry = TransferTelemetry(total=10000, window=5, slots=10, smoothing=0.3)
+    clock.now = 100.1
+    telemetry.add(500)
+
+    # slot of 0.5 second is complete, 1000 bytes/s weighted by smoothing
+    clock.now = 100.6
+    assert telemetry.speed == pytest.approx(300)
+    assert telemetry.peak_rate == pytest.approx(300)
+    assert telemetry.eta == pytest.approx(9500 / 300)
+    assert telemetry.percent == 5
+
+
+def test_idle_slots_decay_speed(clock):
+    telemetry = TransferTelemetry(window=5, slots=10, smoothing=0.5)
+    telemetry.add(500)
+    clock.now = 100.5
+    assert telemetry.speed == pytest.approx(500)
+
+    # two more slots without transfers
+    clock.now = 101.5
+    assert telemetry.speed == pytest.approx(125)
+    assert telemetry.peak_rate == pytest.approx(500)
+
+
+def test_update_ignores_smaller_values(clock):
+    telemetry = TransferTelemetry(total=1000)
+    telemetry.update(300)
+    telemetry.update(200)
+    assert telemetry.done == 300
+
+
+def test_seed_is_not_counted_as_speed(clock):
+    telemetry = TransferTelemetry(total=1000)
+    telemetry.seed(800)
+    telemetry.seed(100)
+    clock.now = 101
+    assert telemetry.done == 800
+    assert telemetry.speed == 0
+    assert telemetry.percent == 80
+
+
+def test_unknown_total(clock):
+    telemetry = TransferTelemetry()
+    telemetry.add(100)
+    clock.now = 101
+    assert telemetry.eta is None
+    assert telemetry.percent == 0
+
+
+def test_format_helpers():
+    assert format_bytes(100) == '100 bytes'
+    assert format_bytes(1536) == '1.5 KB'
+    assert format_time(None) == '--:--'
+    assert format_time(65) == '01:05'
+    assert format_time(3725) == '1:02:05'